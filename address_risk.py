@@ -0,0 +1,257 @@
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+FLAG_MIXER = 1
+FLAG_EXCHANGE = 2
+
+# One packed fixed-size record per address (57 bytes)
+RECORD_DTYPE = np.dtype([
+    ('sent_volume', np.float64),
+    ('received_volume', np.float64),
+    ('first_seen', np.float64),
+    ('last_seen', np.float64),
+    ('sent_count', np.uint32),
+    ('received_count', np.uint32),
+    ('fraud_count', np.float32),        # confirmed fraud labels on this address, decayed
+    ('fraud_neighbours', np.float32),   # transfers with a fraud-labelled counterparty, decayed
+    ('decayed_at', np.float64),         # time the two decayed counts refer to
+    ('flags', np.uint8),
+])
+
+# A decayed label count at or above this still marks the address as fraud
+LABELLED = 0.5
+
+
+class AddressRiskEngine:
+    """
+    Incremental address reputation from observed transactions.
+
+    Keeps running aggregates per address (counts, volume, first/last seen,
+    fraud labels on the address and on its counterparties, mixer/exchange
+    flags) in one growable structured array, so each update and each risk
+    lookup is O(1). Millions of addresses cost the 57-byte record plus the
+    index dict entry. State can be bulk-saved to and restored from a single
+    `.npz` snapshot.
+
+    Fraud labels come only from confirmed sources (`record_label`), never
+    from the model's own verdicts: risk is a feature of the next prediction,
+    so feeding verdicts back would reinforce itself. Label and counterparty
+    counts decay with a half-life of `label_half_life_days`.
+    """
+
+    def __init__(self, initial_capacity: int = 65536, label_half_life_days: float = 30.0):
+        self.half_life = label_half_life_days * 86400
+        self.records = np.zeros(initial_capacity, dtype=RECORD_DTYPE)
+        self.addresses = []
+        self._index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, address: str) -> int:
+        slot = self._index.get(address)
+        if slot is None:
+            slot = len(self.addresses)
+            if slot == len(self.records):
+                grown = np.zeros(len(self.records) * 2, dtype=RECORD_DTYPE)
+                grown[:slot] = self.records
+                self.records = grown
+            self._index[address] = slot
+            self.addresses.append(address)
+        return slot
+
+    def _decay_factor(self, record, now: float) -> float:
+        elapsed = now - float(record['decayed_at'])
+        return 0.5 ** (elapsed / self.half_life) if elapsed > 0 else 1.0
+
+    def _decay(self, record, now: float):
+        factor = self._decay_factor(record, now)
+        record['fraud_count'] *= factor
+        record['fraud_neighbours'] *= factor
+        record['decayed_at'] = max(now, float(record['decayed_at']))
+
+    def _touch(self, record, timestamp: float):
+        if record['first_seen'] == 0 or timestamp < record['first_seen']:
+            record['first_seen'] = timestamp
+        if timestamp > record['last_seen']:
+            record['last_seen'] = timestamp
+
+    def record_transaction(self, sender: str, receiver: str, amount: float,
+                           timestamp: Optional[float] = None):
+        """Fold one observed transfer into both endpoints' aggregates"""
+        # A timestamp ahead of the clock would push decayed_at forward and
+        # pause decay for both addresses until real time caught up
+        now = time.time()
+        timestamp = min(timestamp or now, now)
+
+        with self._lock:
+            if sender:
+                s = self._slot(sender)
+            if receiver:
+                r = self._slot(receiver)
+
+            for slot in (s if sender else None, r if receiver else None):
+                if slot is not None:
+                    self._decay(self.records[slot], timestamp)
+
+            if sender:
+                record = self.records[s]
+                record['sent_count'] += 1
+                record['sent_volume'] += amount
+                self._touch(record, timestamp)
+                if receiver and self.records[r]['fraud_count'] >= LABELLED:
+                    record['fraud_neighbours'] += 1
+
+            if receiver:
+                record = self.records[r]
+                record['received_count'] += 1
+                record['received_volume'] += amount
+                self._touch(record, timestamp)
+                if sender and self.records[s]['fraud_count'] >= LABELLED:
+                    record['fraud_neighbours'] += 1
+
+    def record_label(self, address: str, is_fraud: bool, timestamp: Optional[float] = None):
+        """
+        Apply a confirmed label (analyst feedback, chargeback) to `address`.
+        A confirmed non-fraud label clears earlier fraud labels. Timestamps
+        ahead of the clock are clamped to now.
+        """
+        now = time.time()
+        timestamp = min(timestamp or now, now)
+
+        with self._lock:
+            record = self.records[self._slot(address)]
+            self._decay(record, timestamp)
+            if is_fraud:
+                record['fraud_count'] += 1
+            else:
+                record['fraud_count'] = 0
+
+    def set_flags(self, addresses: Iterable[str], mixer: bool = False, exchange: bool = False):
+        """Mark known mixer and/or exchange addresses"""
+        flags = (FLAG_MIXER if mixer else 0) | (FLAG_EXCHANGE if exchange else 0)
+
+        with self._lock:
+            for address in addresses:
+                slot = self._slot(address)
+                self.records[slot]['flags'] |= flags
+
+    def load_flags(self, filepath: str, mixer: bool = False, exchange: bool = False) -> int:
+        """Flag the addresses listed one per line in `filepath`; returns the count"""
+        with open(filepath) as f:
+            addresses = [line for line in map(str.strip, f) if line and not line.startswith('#')]
+        self.set_flags(addresses, mixer=mixer, exchange=exchange)
+        return len(addresses)
+
+    def risk_score(self, address: str, now: Optional[float] = None) -> float:
+        """Risk in [0, 1] for `address` as of `now`; unknown addresses score 0"""
+        # Under the lock so a concurrent writer is never seen half-way
+        with self._lock:
+            slot = self._index.get(address) if address else None
+            if slot is None:
+                return 0.0
+            return self._score(self.records[slot], now or time.time())
+
+    def _score(self, record, now: float) -> float:
+        factor = self._decay_factor(record, now)
+        fraud_count = float(record['fraud_count']) * factor
+        fraud_neighbours = float(record['fraud_neighbours']) * factor
+
+        flags = int(record['flags'])
+        if flags & FLAG_MIXER:
+            return 0.9 + 0.1 * min(1.0, fraud_count)
+
+        tx_count = int(record['sent_count']) + int(record['received_count'])
+
+        # Noisy-or of independent risk signals
+        own_fraud = 1 - math.exp(-0.7 * fraud_count)
+        # Smoothed and capped at 0.5: a single transfer with a flagged address
+        # (e.g. a victim paying a scammer) adds ~0.08, sustained dealings more
+        exposure = 0.5 * fraud_neighbours / (tx_count + 5)
+        # Busy addresses that appeared recently are more likely to be throwaways
+        age_days = (float(record['last_seen']) - float(record['first_seen'])) / 86400
+        newness = 0.2 * math.exp(-age_days) * min(1.0, tx_count / 50)
+
+        risk = 1 - (1 - own_fraud) * (1 - exposure) * (1 - newness)
+
+        if flags & FLAG_EXCHANGE:
+            risk *= 0.5
+        return float(min(max(risk, 0.0), 1.0))
+
+    def profile(self, address: str) -> Optional[Dict]:
+        """Aggregates for `address` shaped like data_models.AddressProfile"""
+        with self._lock:
+            slot = self._index.get(address)
+            if slot is None:
+                return None
+            record = self.records[slot].copy()
+
+        now = time.time()
+        factor = self._decay_factor(record, now)
+        risk_factors = []
+        if record['fraud_count'] * factor >= LABELLED:
+            risk_factors.append('fraud_labelled')
+        if record['fraud_neighbours'] * factor >= LABELLED:
+            risk_factors.append('fraud_counterparties')
+        if record['flags'] & FLAG_MIXER:
+            risk_factors.append('mixer')
+
+        risk = self._score(record, now)
+        return {
+            'address': address,
+            'risk_score': risk,
+            'transaction_count': int(record['sent_count']) + int(record['received_count']),
+            'total_volume': float(record['sent_volume']) + float(record['received_volume']),
+            'first_seen': _isoformat(record['first_seen']),
+            'last_seen': _isoformat(record['last_seen']),
+            'risk_factors': risk_factors,
+            'is_exchange': bool(record['flags'] & FLAG_EXCHANGE),
+            'is_mixer': bool(record['flags'] & FLAG_MIXER),
+            'reputation_score': 1.0 - risk
+        }
+
+    def snapshot(self, filepath: str):
+        """Write all records and addresses to one `.npz` file atomically"""
+        with self._lock:
+            count = len(self.addresses)
+            records = self.records[:count].copy()
+            addresses = np.frombuffer('\n'.join(self.addresses).encode(), dtype=np.uint8)
+
+        tmp_path = f"{filepath}.tmp.npz"
+        np.savez(tmp_path, records=records, addresses=addresses)
+        os.replace(tmp_path, filepath)
+
+    def restore(self, filepath: str):
+        """Replace the current state with a snapshot written by `snapshot`"""
+        with np.load(filepath, allow_pickle=False) as data:
+            records = data['records']
+            raw = data['addresses'].tobytes().decode()
+
+        addresses = raw.split('\n') if raw else []
+        with self._lock:
+            self.records = np.zeros(max(len(records) * 2, 1024), dtype=RECORD_DTYPE)
+            # Field by field, so snapshots from older record layouts still load
+            for name in records.dtype.names:
+                if name in RECORD_DTYPE.names:
+                    self.records[name][:len(records)] = records[name]
+            self.addresses = addresses
+            self._index = {address: i for i, address in enumerate(addresses)}
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def get_stats(self) -> Dict:
+        """Get engine occupancy statistics"""
+        return {
+            'tracked_addresses': len(self.addresses),
+            'capacity': len(self.records),
+            'records_bytes': self.records.nbytes
+        }
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(float(timestamp)).isoformat() if timestamp else ''
@@ -4,15 +4,24 @@ from pydantic import BaseModel
 from typing import Dict, List, Optional
 import asyncio
 import logging
-import redis
+import os
+import redis.asyncio as aioredis
 import json
 from datetime import datetime
 import numpy as np
 import pandas as pd
 
 from fraud_detector import FraudDetector
+from feature_store import VelocityFeatureStore
+from address_risk import AddressRiskEngine
 from blockchain_monitor import BlockchainMonitor
-from data_models import TransactionData, FraudPrediction, AlertLevel
+from micro_batcher import MicroBatcher
+from inference_pool import InferencePool
+from write_behind_cache import WriteBehindCache
+from prediction_index import PredictionIndex
+from prediction_stats import PredictionStats
+from monitor_scorer import MonitorScorer
+from data_models import TransactionData, FraudPrediction, AlertLevel, AddressProfile, LabelFeedback
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,21 +44,99 @@ app.add_middleware(
 )
 
 # Initialize components
-fraud_detector = FraudDetector()
-blockchain_monitor = BlockchainMonitor()
-redis_client = redis.Redis(host='localhost', port=6379, decode_responses=True)
+velocity_store = VelocityFeatureStore(max_addresses=int(os.getenv('VELOCITY_MAX_ADDRESSES', 100000)))
+address_risk = AddressRiskEngine()
+fraud_detector = FraudDetector(feature_store=velocity_store, risk_engine=address_risk)
+# One bounded asyncio connection pool shared by the API and the monitor
+redis_pool = aioredis.BlockingConnectionPool(
+    host='localhost',
+    port=6379,
+    max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 20)),
+    decode_responses=True
+)
+redis_client = aioredis.Redis(connection_pool=redis_pool)
+
+# Prediction and pending-analysis writes are buffered and sent in pipelines
+prediction_cache = WriteBehindCache(
+    redis_client,
+    max_batch=int(os.getenv('CACHE_FLUSH_BATCH', 500)),
+    flush_interval_ms=float(os.getenv('CACHE_FLUSH_INTERVAL_MS', 5)),
+    max_pending=int(os.getenv('CACHE_MAX_PENDING', 50000))
+)
+# Predictions are indexed by time and alerts by confidence for bounded reads
+prediction_index = PredictionIndex(redis_client, prediction_cache, ttl=3600)
+# Rolling prediction counters, periodically added to Redis hashes
+prediction_stats = PredictionStats(
+    prediction_cache, flush_interval=float(os.getenv('STATS_FLUSH_INTERVAL', 10))
+)
+blockchain_monitor = BlockchainMonitor(
+    feature_store=velocity_store, risk_engine=address_risk, cache=prediction_cache,
+    redis_client=redis_client
+)
+
+MODEL_PATH = "./models/fraud_model"
+# Memory-map the flat serving arrays so worker processes share one copy
+MODEL_MMAP = os.getenv('MODEL_MMAP', 'false').lower() == 'true'
+ADDRESS_RISK_SNAPSHOT = os.getenv('ADDRESS_RISK_SNAPSHOT', './models/address_risk.npz')
+# Known mixer / exchange addresses, one per line
+MIXER_ADDRESSES_FILE = os.getenv('MIXER_ADDRESSES_FILE', './models/mixer_addresses.txt')
+EXCHANGE_ADDRESSES_FILE = os.getenv('EXCHANGE_ADDRESSES_FILE', './models/exchange_addresses.txt')
+
+# Model inference runs on a worker pool so it never blocks the event loop
+inference_pool = InferencePool(
+    fraud_detector,
+    mode=os.getenv('INFERENCE_POOL_MODE', 'thread'),
+    max_workers=int(os.getenv('INFERENCE_WORKERS', 2)),
+    max_pending=int(os.getenv('INFERENCE_MAX_PENDING', 32)),
+    model_path=MODEL_PATH,
+    mmap_model=MODEL_MMAP
+)
+
+# Concurrent /predict requests are scored together in small batches
+micro_batcher = MicroBatcher(
+    inference_pool.predict_batch,
+    max_batch_size=int(os.getenv('PREDICT_MAX_BATCH', 64)),
+    max_delay_ms=float(os.getenv('PREDICT_MAX_DELAY_MS', 5)),
+    max_queue_size=int(os.getenv('PREDICT_QUEUE_SIZE', 1024))
+)
+
+# Score everything the monitor ingests, in batches, through the same
+# cache, alert and stats path as /predict
+monitor_scorer = MonitorScorer(inference_pool.predict_batch, prediction_index, prediction_stats)
+blockchain_monitor.add_batch_callback(monitor_scorer)
 
 # Load pre-trained model if available
 try:
-    fraud_detector.load_model("./models/fraud_model")
+    fraud_detector.load_model(MODEL_PATH, mmap=MODEL_MMAP)
     logger.info("Pre-trained model loaded successfully")
 except:
     logger.warning("No pre-trained model found. Training required.")
 
+# Restore address reputation aggregates from the last shutdown
+if os.path.exists(ADDRESS_RISK_SNAPSHOT):
+    try:
+        address_risk.restore(ADDRESS_RISK_SNAPSHOT)
+        logger.info(f"Restored {len(address_risk)} address profiles")
+    except Exception as e:
+        logger.warning(f"Failed to restore address risk snapshot: {e}")
+
+# Load mixer / exchange flags after the snapshot so list edits take effect
+for flags_file, flag in ((MIXER_ADDRESSES_FILE, 'mixer'), (EXCHANGE_ADDRESSES_FILE, 'exchange')):
+    if os.path.exists(flags_file):
+        try:
+            count = address_risk.load_flags(flags_file, **{flag: True})
+            logger.info(f"Flagged {count} {flag} addresses")
+        except Exception as e:
+            logger.warning(f"Failed to load {flag} addresses: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting HATHOR AI Guardian API...")
+    await prediction_cache.start()
+    await prediction_index.start()
+    await prediction_stats.start()
+    await micro_batcher.start()
     # Start blockchain monitoring in background
     asyncio.create_task(blockchain_monitor.start_monitoring())
 
@@ -58,6 +145,17 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down HATHOR AI Guardian API...")
     await blockchain_monitor.stop_monitoring()
+    await micro_batcher.stop()
+    await prediction_stats.stop()
+    await prediction_cache.stop()
+    await prediction_index.stop()
+    await redis_client.close()
+    await redis_pool.disconnect()
+    inference_pool.shutdown()
+    try:
+        address_risk.snapshot(ADDRESS_RISK_SNAPSHOT)
+    except Exception as e:
+        logger.error(f"Failed to snapshot address risk: {e}")
 
 @app.get("/")
 async def root():
@@ -70,6 +168,9 @@ async def root():
             "fraud_detection": "/predict",
             "batch_analysis": "/batch-predict",
             "model_stats": "/model/stats",
+            "metrics": "/metrics",
+            "address_profile": "/address/{address}",
+            "label_feedback": "/feedback",
             "health": "/health"
         }
     }
@@ -81,13 +182,29 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "model_loaded": fraud_detector.is_trained,
-        "redis_connected": redis_client.ping(),
+        "redis_connected": await redis_client.ping(),
         "services": {
             "fraud_detector": "active",
             "blockchain_monitor": "active"
         }
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Serving pipeline metrics"""
+    return {
+        "micro_batcher": micro_batcher.get_metrics(),
+        "inference_pool": inference_pool.get_metrics(),
+        "prediction_cache": prediction_cache.get_metrics(),
+        "ingestion_queue": blockchain_monitor.ingestion_queue.get_metrics(),
+        "dedup_filter": blockchain_monitor.dedup_filter.get_stats(),
+        "transaction_filter": blockchain_monitor.transaction_filter.get_stats(),
+        "monitor_scorer": monitor_scorer.get_metrics(),
+        "feature_store": velocity_store.get_stats(),
+        "address_risk": address_risk.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.post("/predict", response_model=FraudPrediction)
 async def predict_fraud(transaction: TransactionData):
     """Predict if a transaction is fraudulent"""
@@ -95,16 +212,12 @@ async def predict_fraud(transaction: TransactionData):
         # Convert to dict for processing
         tx_dict = transaction.dict()
         
-        # Get prediction from fraud detector
-        result = fraud_detector.predict(tx_dict)
+        # Get prediction from fraud detector, batched with concurrent requests
+        result = await micro_batcher.submit(tx_dict)
         
-        # Cache result in Redis
-        cache_key = f"prediction:{transaction.tx_hash}"
-        redis_client.setex(
-            cache_key, 
-            3600,  # 1 hour TTL
-            json.dumps(result)
-        )
+        # Cache and index result in Redis (written behind, in the next pipeline flush)
+        prediction_index.record(transaction.tx_hash, result)
+        prediction_stats.record(result)
         
         # Determine alert level
         if result['confidence'] > 0.8:
@@ -125,6 +238,8 @@ async def predict_fraud(transaction: TransactionData):
             timestamp=result['timestamp']
         )
         
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Prediction queue is full")
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -135,10 +250,10 @@ async def batch_predict(transactions: List[TransactionData]):
     try:
         results = []
         
-        for tx in transactions:
-            tx_dict = tx.dict()
-            result = fraud_detector.predict(tx_dict)
-            
+        # Score the whole batch in one vectorized pass
+        batch_results = await inference_pool.predict_batch([tx.dict() for tx in transactions])
+        
+        for tx, result in zip(transactions, batch_results):
             # Determine alert level
             if result['confidence'] > 0.8:
                 alert_level = AlertLevel.HIGH
@@ -159,6 +274,12 @@ async def batch_predict(transactions: List[TransactionData]):
             )
             results.append(prediction)
         
+        # Cache and index all results in one pipeline round trip
+        await prediction_index.record_many(
+            (tx.tx_hash, result) for tx, result in zip(transactions, batch_results)
+        )
+        prediction_stats.record_many(batch_results)
+        
         return {
             "batch_id": f"batch_{datetime.now().timestamp()}",
             "total_transactions": len(transactions),
@@ -166,6 +287,8 @@ async def batch_predict(transactions: List[TransactionData]):
             "results": results
         }
         
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Inference pool is saturated")
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -179,26 +302,11 @@ async def get_model_stats():
         
         feature_importance = fraud_detector.get_feature_importance()
         
-        # Get prediction statistics from Redis
-        prediction_keys = redis_client.keys("prediction:*")
-        recent_predictions = []
-        
-        for key in prediction_keys[-100:]:  # Last 100 predictions
-            pred_data = redis_client.get(key)
-            if pred_data:
-                recent_predictions.append(json.loads(pred_data))
-        
-        fraud_count = sum(1 for p in recent_predictions if p.get('is_fraud'))
-        
         return {
             "model_status": "trained",
             "feature_importance": feature_importance,
-            "recent_stats": {
-                "total_predictions": len(recent_predictions),
-                "fraud_detected": fraud_count,
-                "fraud_rate": fraud_count / len(recent_predictions) if recent_predictions else 0,
-                "avg_confidence": np.mean([p.get('confidence', 0) for p in recent_predictions]) if recent_predictions else 0
-            },
+            # Counters from every API process: all-time totals plus 1m/5m/1h windows
+            "recent_stats": await prediction_stats.fetch_stats(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -209,6 +317,12 @@ async def get_model_stats():
 @app.post("/model/retrain")
 async def retrain_model(background_tasks: BackgroundTasks):
     """Trigger model retraining with new data"""
+    if MODEL_MMAP:
+        raise HTTPException(
+            status_code=409,
+            detail="Retraining is disabled while serving a memory-mapped model (MODEL_MMAP=true)"
+        )
+    
     try:
         # This would typically fetch new labeled data
         # For now, we'll simulate with cached predictions
@@ -224,8 +338,17 @@ async def retrain_model(background_tasks: BackgroundTasks):
         logger.error(f"Retrain error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _train_detector(training_data: pd.DataFrame, labels: np.ndarray):
+    """Train a fresh detector on the shared stores and save it to MODEL_PATH"""
+    detector = FraudDetector(feature_store=velocity_store, risk_engine=address_risk)
+    results = detector.train(training_data, labels)
+    detector.save_model(MODEL_PATH)
+    return detector, results
+
 async def retrain_model_task():
     """Background task for model retraining"""
+    global fraud_detector
+    
     try:
         logger.info("Starting model retraining...")
         
@@ -252,16 +375,17 @@ async def retrain_model_task():
         # Generate synthetic labels (10% fraud)
         labels = np.random.choice([0, 1], n_samples, p=[0.9, 0.1])
         
-        # Retrain model
-        results = fraud_detector.train(training_data, labels)
+        # Train and save a new detector off the event loop; the serving one
+        # keeps scoring until it is swapped out
+        detector, results = await asyncio.to_thread(_train_detector, training_data, labels)
         
-        # Save updated model
-        fraud_detector.save_model("./models/fraud_model")
+        fraud_detector = detector
+        inference_pool.reload_model(detector)
         
         logger.info("Model retraining completed successfully")
         
         # Cache training results
-        redis_client.setex(
+        await redis_client.setex(
             "training_results",
             86400,  # 24 hours
             json.dumps(results, default=str)
@@ -270,34 +394,36 @@ async def retrain_model_task():
     except Exception as e:
         logger.error(f"Retraining task error: {e}")
 
+@app.post("/feedback")
+async def submit_feedback(feedback: LabelFeedback):
+    """Record a confirmed fraud label for an address"""
+    # Only confirmed labels feed address reputation; the model's own
+    # verdicts never do, as risk is an input to the next prediction
+    address_risk.record_label(feedback.address, feedback.is_fraud, feedback.timestamp)
+    logger.info(
+        f"Label from {feedback.source}: {feedback.address} is_fraud={feedback.is_fraud} "
+        f"(tx {feedback.tx_hash})"
+    )
+    return {
+        "address": feedback.address,
+        "risk_score": address_risk.risk_score(feedback.address),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/address/{address}", response_model=AddressProfile)
+async def get_address_profile(address: str):
+    """Get reputation aggregates and risk score for an address"""
+    profile = address_risk.profile(address)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Address not seen")
+    return AddressProfile(**profile)
+
 @app.get("/alerts/recent")
 async def get_recent_alerts():
     """Get recent fraud alerts"""
     try:
-        # Get recent high-confidence fraud predictions
-        prediction_keys = redis_client.keys("prediction:*")
-        alerts = []
-        
-        for key in prediction_keys:
-            pred_data = redis_client.get(key)
-            if pred_data:
-                prediction = json.loads(pred_data)
-                if prediction.get('is_fraud') and prediction.get('confidence', 0) > 0.7:
-                    alerts.append({
-                        "tx_hash": key.split(":")[-1],
-                        "confidence": prediction['confidence'],
-                        "risk_score": prediction['risk_score'],
-                        "timestamp": prediction['timestamp']
-                    })
-        
-        # Sort by confidence (highest first)
-        alerts.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        return {
-            "total_alerts": len(alerts),
-            "high_risk_alerts": len([a for a in alerts if a['confidence'] > 0.9]),
-            "alerts": alerts[:50]  # Return top 50 alerts
-        }
+        # Get recent high-confidence fraud predictions, highest confidence first
+        return await prediction_index.alerts(limit=50)  # Return top 50 alerts
         
     except Exception as e:
         logger.error(f"Alerts error: {e}")
@@ -1,29 +1,93 @@
 import asyncio
 import aiohttp
+from collections import deque
 import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable
 import websockets
 from web3 import Web3
-import redis
+import redis.asyncio as aioredis
+
+from write_behind_cache import WriteBehindCache
+from ingestion_queue import IngestionQueue
+from http_session import RequestTimings, create_session
+from checkpoint_store import CheckpointStore
+from dedup_filter import RotatingBloomFilter
+from transaction_filter import TransactionFilter
+from stream_recorder import StreamRecorder
+from prediction_index import PREDICTION_KEY
+from feature_store import snapshot_history
 
 class BlockchainMonitor:
     """
     Real-time blockchain transaction monitoring system
     """
     
-    def __init__(self, config: Dict = None):
+    def __init__(self, config: Dict = None, feature_store=None, risk_engine=None, cache=None,
+                 redis_client=None):
         self.logger = logging.getLogger(__name__)
         self.config = config or self._default_config()
         self.is_monitoring = False
         self.callbacks = []
-        self.redis_client = redis.Redis(
-            host=self.config.get('redis_host', 'localhost'),
-            port=self.config.get('redis_port', 6379),
-            decode_responses=True
+        self.batch_callbacks = []
+        # VelocityFeatureStore updated with every transaction seen
+        self.feature_store = feature_store
+        # AddressRiskEngine aggregating per-address history
+        self.risk_engine = risk_engine
+        # Asyncio client on a bounded pool; a client passed in (and its pool)
+        # is shared with its owner
+        self._owns_redis = redis_client is None
+        self.redis_client = redis_client or aioredis.Redis(
+            connection_pool=aioredis.BlockingConnectionPool(
+                host=self.config.get('redis_host', 'localhost'),
+                port=self.config.get('redis_port', 6379),
+                max_connections=self.config.get('redis_max_connections', 10),
+                decode_responses=True
+            )
+        )
+        # Pending-analysis writes are buffered and pipelined; a cache passed
+        # in is shared with (and flushed by) its owner
+        self._owns_cache = cache is None
+        self.cache = cache or WriteBehindCache(self.redis_client)
+        
+        # Callbacks run on consumer tasks so slow analysis never stalls ingestion
+        ingestion = self.config.get('ingestion', {})
+        self.ingestion_queue = IngestionQueue(
+            self._dispatch,
+            max_size=ingestion.get('queue_size', 10000),
+            consumers=ingestion.get('consumers', 2),
+            batch_size=self.config['monitoring']['batch_size'],
+            max_wait_ms=ingestion.get('max_wait_ms', 50),
+            full_policy=ingestion.get('full_policy', 'block'),
+            redis_client=self.redis_client,
+            already_handled=self._already_scored
+        )
+        
+        # Durable per-network position, so restarts resume where they stopped
+        checkpoint = self.config.get('checkpoint', {})
+        self.checkpoints = CheckpointStore(
+            backend=checkpoint.get('backend', 'redis'),
+            redis_client=self.redis_client,
+            path=checkpoint.get('path', './checkpoints')
         )
         
+        # Drops transfers already sent, e.g. re-delivered after a reconnect
+        dedup = self.config.get('dedup', {})
+        self.dedup_filter = RotatingBloomFilter(
+            capacity=dedup.get('capacity', 1000000),
+            error_rate=dedup.get('error_rate', 0.001),
+            window_seconds=dedup.get('window_seconds', 3600)
+        )
+        
+        # Filters compiled once; reloaded on `update_filters` or when the
+        # exclude-address file changes
+        self.transaction_filter = TransactionFilter(self.config['filters'])
+        
+        # Optional capture of raw network data for StreamReplay
+        recording_path = self.config.get('recording', {}).get('path')
+        self.recorder = StreamRecorder(recording_path) if recording_path else None
+        
         # Network connections
         self.network_connections = {}
         self.initialize_network_connections()
@@ -41,7 +105,10 @@ class BlockchainMonitor:
                     'enabled': False,
                     'websocket_url': 'wss://mainnet.infura.io/ws/v3/YOUR_KEY',
                     'rest_api': 'https://mainnet.infura.io/v3/YOUR_KEY',
-                    'poll_interval': 12
+                    'poll_interval': 12,
+                    'max_lag_blocks': 128,          # never catch up further back than this
+                    'rpc_batch_size': 20,           # eth_getBlockByNumber calls per POST
+                    'max_concurrent_requests': 4
                 }
             },
             'monitoring': {
@@ -50,10 +117,43 @@ class BlockchainMonitor:
                 'retry_delay': 5,
                 'health_check_interval': 60
             },
+            'ingestion': {
+                'queue_size': 10000,
+                'consumers': 2,
+                'max_wait_ms': 50,
+                'full_policy': 'block', # or 'drop_oldest' / 'spill'
+                'drain_timeout': 30     # seconds stop waits for queued transactions
+            },
+            'checkpoint': {
+                'backend': 'redis',             # or 'file'
+                'path': './checkpoints',
+                'every_blocks': 10,             # save after this many blocks (Hathor: transactions)
+                'overlap_blocks': 12,           # Ethereum blocks re-read behind the checkpoint
+                'overlap_seconds': 300,         # Hathor history re-read behind the checkpoint
+                'max_replay_transactions': 10000
+            },
+            'dedup': {
+                'capacity': 1000000,    # keys per filter generation
+                'error_rate': 0.001,    # false-positive budget (new transfer treated as seen)
+                'window_seconds': 3600  # rotate generations at least this often
+            },
+            'http': {
+                'pool_size': 20,
+                'pool_size_per_host': 10,
+                'keepalive_timeout': 60,
+                'dns_ttl': 300,
+                'connect_timeout': 5,
+                'read_timeout': 20,
+                'total_timeout': 30
+            },
+            'recording': {
+                'path': None    # e.g. './recordings/monitor.jsonl.gz'
+            },
             'filters': {
-                'min_amount': 0,
+                'min_amount': 0,                # in whole coins (HTR, ETH)
                 'max_amount': None,
                 'exclude_addresses': [],
+                'exclude_addresses_file': None, # one address per line, reloaded on change
                 'transaction_types': ['transfer', 'contract_call']
             }
         }
@@ -65,18 +165,46 @@ class BlockchainMonitor:
                 self.network_connections[network] = {
                     'config': config,
                     'connection': None,
+                    'session': None,    # long-lived aiohttp session, see _get_session
+                    'timings': RequestTimings(),
                     'last_block': 0,
-                    'status': 'disconnected'
+                    'status': 'disconnected',
+                    'checkpoint': None,         # last scored block / tx_hash / timestamp
+                    'saved_checkpoint': None,
+                    'ingested': None,           # last position handed to the ingestion queue
+                    'pending_positions': deque(),   # (queue sequence, position) not yet scored
+                    'unsaved_blocks': 0,
+                    'dedup_until': None,        # re-read positions up to here may be scored already
+                    'replay_from': None,        # Hathor timestamp to replay history from
+                    'deduplicated': 0,
+                    'failed_block': None,       # block that failed to process, and how often
+                    'block_failures': 0,
+                    'skipped_blocks': 0
                 }
     
     def add_callback(self, callback: Callable):
         """Add callback function for transaction processing"""
         self.callbacks.append(callback)
     
+    def update_filters(self, filters: Dict):
+        """Replace the transaction filters without restarting the monitor"""
+        self.config['filters'] = filters
+        self.transaction_filter.reload(filters)
+    
+    def add_batch_callback(self, callback: Callable):
+        """Add callback function receiving each consumed batch of transactions"""
+        self.batch_callbacks.append(callback)
+    
     async def start_monitoring(self):
         """Start monitoring all enabled networks"""
         self.logger.info("Starting blockchain monitoring...")
         self.is_monitoring = True
+        if self._owns_cache:
+            await self.cache.start()
+        await self.ingestion_queue.start()
+        for conn_info in self.network_connections.values():
+            self._get_session(conn_info)
+        await self._restore_checkpoints()
         
         # Start monitoring tasks for each network
         tasks = []
@@ -106,6 +234,108 @@ class BlockchainMonitor:
                 except:
                     pass
                 conn_info['status'] = 'disconnected'
+            if conn_info['session']:
+                await conn_info['session'].close()
+                conn_info['session'] = None
+        
+        # Score what is still queued so the final checkpoints cover it
+        drain_timeout = self.config.get('ingestion', {}).get('drain_timeout', 30)
+        try:
+            await asyncio.wait_for(self.ingestion_queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"Ingestion queue not drained after {drain_timeout}s; "
+                "checkpoints stay at the last scored position"
+            )
+        for network in self.network_connections:
+            await self._save_checkpoint(network)
+        
+        if self.recorder is not None:
+            self.recorder.close()
+        await self.ingestion_queue.stop()
+        if self._owns_cache:
+            await self.cache.stop()
+        if self._owns_redis:
+            await self.redis_client.close()
+            await self.redis_client.connection_pool.disconnect()
+    
+    async def _restore_checkpoints(self):
+        """Resume each network from its checkpoint, an overlap window behind it"""
+        settings = self.config.get('checkpoint', {})
+        
+        for network, conn_info in self.network_connections.items():
+            try:
+                checkpoint = await self.checkpoints.load(network)
+            except Exception as e:
+                self.logger.error(f"Failed to load {network} checkpoint: {e}")
+                continue
+            if not checkpoint:
+                continue
+            
+            conn_info['checkpoint'] = conn_info['saved_checkpoint'] = checkpoint
+            if network == 'ethereum':
+                conn_info['last_block'] = max(checkpoint['block'] - settings.get('overlap_blocks', 12), 0)
+                # Blocks after the scored position may have been scored before the restart
+                conn_info['dedup_until'] = max(
+                    checkpoint['block'] + settings.get('every_blocks', 10),
+                    checkpoint.get('ingested_block') or 0
+                )
+            elif checkpoint.get('timestamp'):
+                conn_info['replay_from'] = checkpoint['timestamp'] - settings.get('overlap_seconds', 300)
+            
+            self.logger.info(f"Resuming {network} from checkpoint {checkpoint}")
+    
+    async def _record_progress(self, network: str, block: Optional[int], tx_hash: Optional[str],
+                               timestamp: Optional[float]):
+        """
+        Note a position whose transactions are all queued. It becomes the
+        checkpoint once the ingestion queue has handled everything queued up
+        to it; a checkpoint is saved every N positions.
+        """
+        conn_info = self.network_connections[network]
+        position = {'block': block, 'tx_hash': tx_hash, 'timestamp': timestamp}
+        conn_info['ingested'] = position
+        conn_info['pending_positions'].append((self.ingestion_queue.enqueued, position))
+        self._advance_checkpoint(conn_info)
+        conn_info['unsaved_blocks'] += 1
+        
+        if conn_info['unsaved_blocks'] >= self.config.get('checkpoint', {}).get('every_blocks', 10):
+            await self._save_checkpoint(network)
+    
+    def _advance_checkpoint(self, conn_info: Dict):
+        """Move the checkpoint to the newest position that has been fully scored"""
+        completed = self.ingestion_queue.completed_through()
+        pending = conn_info['pending_positions']
+        while pending and pending[0][0] <= completed:
+            conn_info['checkpoint'] = pending.popleft()[1]
+    
+    async def _save_checkpoint(self, network: str):
+        conn_info = self.network_connections[network]
+        self._advance_checkpoint(conn_info)
+        if not conn_info['checkpoint'] or conn_info['checkpoint'] is conn_info['saved_checkpoint']:
+            return
+        
+        checkpoint = {**conn_info['checkpoint'], 'ingested_block': (conn_info['ingested'] or {}).get('block')}
+        try:
+            await self.checkpoints.save(network, checkpoint)
+            conn_info['saved_checkpoint'] = conn_info['checkpoint']
+            conn_info['unsaved_blocks'] = 0
+        except Exception as e:
+            self.logger.error(f"Failed to save {network} checkpoint: {e}")
+    
+    async def _already_scored(self, tx_hashes: List[str]) -> set:
+        """Hashes among `tx_hashes` that already have a cached prediction"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for tx_hash in tx_hashes:
+            pipe.exists(PREDICTION_KEY.format(tx_hash))
+        found = await pipe.execute()
+        return {tx_hash for tx_hash, exists in zip(tx_hashes, found) if exists}
+    
+    def _get_session(self, connection_info: Dict) -> aiohttp.ClientSession:
+        """The network's persistent HTTP session, created on first use"""
+        if connection_info['session'] is None or connection_info['session'].closed:
+            connection_info['session'] = create_session(self.config.get('http'), connection_info['timings'])
+        return connection_info['session']
     
     async def _monitor_network(self, network: str):
         """Monitor specific blockchain network"""
@@ -146,15 +376,27 @@ class BlockchainMonitor:
             }
             await connection_info['connection'].send(json.dumps(subscribe_msg))
             
+            # Fill the gap since the checkpoint; live messages buffer meanwhile
+            if connection_info['replay_from'] is not None:
+                await self._replay_hathor(connection_info)
+                connection_info['replay_from'] = None
+            
             # Listen for new transactions
             async for message in connection_info['connection']:
                 if not self.is_monitoring:
                     break
                 
+                if self.recorder is not None:
+                    self.recorder.record_hathor_message(message)
+                
                 try:
                     data = json.loads(message)
                     if data.get('type') == 'new_transaction':
                         await self._process_hathor_transaction(data['data'])
+                        await self._record_progress(
+                            'hathor', data['data'].get('height'),
+                            data['data'].get('hash'), data['data'].get('timestamp')
+                        )
                         
                 except json.JSONDecodeError:
                     self.logger.warning(f"Invalid JSON received: {message}")
@@ -169,6 +411,37 @@ class BlockchainMonitor:
             self.logger.error(f"Hathor monitoring error: {e}")
             connection_info['status'] = 'error'
     
+    async def _replay_hathor(self, connection_info: Dict):
+        """
+        Re-read Hathor transactions newer than `replay_from` from the REST
+        API (newest first, paging back) and process them oldest first.
+        """
+        config = connection_info['config']
+        session = self._get_session(connection_info)
+        since = connection_info['replay_from']
+        limit = self.config.get('checkpoint', {}).get('max_replay_transactions', 10000)
+        
+        params = {'type': 'tx', 'count': 100}
+        history = []
+        while len(history) < limit:
+            async with session.get(f"{config['rest_api']}/transaction", params=params) as response:
+                data = await response.json()
+            
+            page = data.get('transactions', [])
+            history.extend(tx for tx in page if tx.get('timestamp', 0) >= since)
+            if not page or page[-1].get('timestamp', 0) < since or not data.get('has_more'):
+                break
+            params = {
+                'type': 'tx', 'count': 100, 'page': 'next',
+                'timestamp': page[-1]['timestamp'], 'hash': page[-1].get('tx_id') or page[-1].get('hash')
+            }
+        
+        self.logger.info(f"Replaying {len(history)} Hathor transactions since {since}")
+        for tx_data in reversed(history[:limit]):
+            tx_data.setdefault('hash', tx_data.get('tx_id'))
+            await self._process_hathor_transaction(tx_data, replay=True)
+            await self._record_progress('hathor', tx_data.get('height'), tx_data['hash'], tx_data.get('timestamp'))
+    
     async def _monitor_ethereum(self, connection_info: Dict):
         """Monitor Ethereum network transactions"""
         config = connection_info['config']
@@ -176,25 +449,37 @@ class BlockchainMonitor:
         try:
             # For Ethereum, we'll use HTTP polling instead of WebSocket
             # due to complexity of WebSocket subscription management
-            async with aiohttp.ClientSession() as session:
-                # Get latest block number
-                latest_block = await self._get_ethereum_latest_block(session, config)
-                
-                if latest_block > connection_info['last_block']:
-                    # Process new blocks
-                    for block_num in range(connection_info['last_block'] + 1, latest_block + 1):
-                        await self._process_ethereum_block(session, config, block_num)
-                    
-                    connection_info['last_block'] = latest_block
-                    connection_info['status'] = 'connected'
+            session = self._get_session(connection_info)
+            
+            # Get latest block number
+            latest_block = await self._get_ethereum_latest_block(session, config)
+            
+            if latest_block > connection_info['last_block']:
+                # Process new blocks, skipping anything outside the lag window
+                first_block = max(
+                    connection_info['last_block'] + 1,
+                    latest_block - config.get('max_lag_blocks', 128) + 1
+                )
+                if first_block > connection_info['last_block'] + 1 and connection_info['last_block']:
+                    self.logger.warning(
+                        f"Ethereum monitor is {latest_block - connection_info['last_block']} blocks behind; "
+                        f"skipping to block {first_block}"
+                    )
+                await self._catch_up_ethereum(session, connection_info, first_block, latest_block)
+                connection_info['status'] = 'connected'
         
         except Exception as e:
             self.logger.error(f"Ethereum monitoring error: {e}")
             connection_info['status'] = 'error'
     
-    async def _process_hathor_transaction(self, tx_data: Dict):
+    async def _process_hathor_transaction(self, tx_data: Dict, replay: bool = False):
         """Process Hathor transaction data"""
         try:
+            # Replayed history may overlap what was scored before a restart
+            if replay and await self._already_scored([tx_data.get('hash')]):
+                self.network_connections['hathor']['deduplicated'] += 1
+                return
+            
             # Extract transaction information
             transaction = {
                 'tx_hash': tx_data.get('hash'),
@@ -204,27 +489,160 @@ class BlockchainMonitor:
                 'outputs': tx_data.get('outputs', [])
             }
             
-            # Process each output as a potential transaction
-            for output in transaction['outputs']:
-                if self._should_analyze_transaction(output):
-                    analyzed_tx = {
-                        'tx_hash': transaction['tx_hash'],
-                        'amount': output.get('value', 0) / 100,  # Convert from cents
-                        'sender': self._extract_sender(transaction['inputs']),
-                        'receiver': output.get('script'),
-                        'timestamp': transaction['timestamp'],
-                        'network': 'hathor',
-                        'tx_type': 'transfer',
-                        'block_height': tx_data.get('height'),
-                        'confirmations': 1
-                    }
-                    
-                    # Send to fraud detection
-                    await self._send_for_analysis(analyzed_tx)
+            # Fold the qualifying outputs into one record per transaction
+            sender = self._extract_sender(transaction['inputs'])
+            outputs = [
+                {
+                    'index': index,
+                    'receiver': output.get('script'),
+                    'amount': output.get('value', 0) / 100  # Convert from cents
+                }
+                for index, output in self.transaction_filter.filter_outputs(
+                    'hathor', sender, transaction['outputs']
+                )
+            ]
+            if not outputs:
+                return
+            
+            largest = max(outputs, key=lambda output: output['amount'])
+            analyzed_tx = {
+                'tx_hash': transaction['tx_hash'],
+                'amount': sum(output['amount'] for output in outputs),
+                'sender': sender,
+                'receiver': largest['receiver'],
+                'timestamp': transaction['timestamp'],
+                'network': 'hathor',
+                'tx_type': 'transfer',
+                'block_height': tx_data.get('height'),
+                'confirmations': 1,
+                'output_count': len(outputs),
+                'max_output': largest['amount'],
+                'fan_out': len({output['receiver'] for output in outputs}),
+                # Per-output detail, kept with the prediction only if it is flagged
+                'outputs': outputs
+            }
+            
+            # Send to fraud detection
+            await self._send_for_analysis(analyzed_tx)
         
         except Exception as e:
             self.logger.error(f"Error processing Hathor transaction: {e}")
     
+    async def _catch_up_ethereum(self, session: aiohttp.ClientSession, connection_info: Dict,
+                                 first_block: int, last_block: int):
+        """
+        Fetch blocks first_block..last_block in JSON-RPC batches, several
+        batches in flight at once, and process them strictly in order.
+        """
+        config = connection_info['config']
+        batch_size = config.get('rpc_batch_size', 20)
+        max_in_flight = config.get('max_concurrent_requests', 4)
+        
+        batches = iter([
+            list(range(start, min(start + batch_size, last_block + 1)))
+            for start in range(first_block, last_block + 1, batch_size)
+        ])
+        in_flight = deque()
+        
+        try:
+            while True:
+                # Keep up to max_in_flight batch requests running ahead
+                while len(in_flight) < max_in_flight:
+                    block_nums = next(batches, None)
+                    if block_nums is None:
+                        break
+                    in_flight.append(asyncio.create_task(
+                        self._fetch_ethereum_blocks(session, config, block_nums)
+                    ))
+                if not in_flight:
+                    return
+                
+                for block_num, block_data in await in_flight.popleft():
+                    # Stop at a block that failed so the next poll retries it
+                    # and the checkpoint never moves past it
+                    if not await self._process_ethereum_block_data(block_num, block_data) \
+                            and not self._give_up_on_block(connection_info, block_num):
+                        raise RuntimeError(f"Ethereum block {block_num} failed to process; retrying on the next poll")
+                    if self.recorder is not None:
+                        self.recorder.record_ethereum_block(block_num, block_data)
+                    connection_info['last_block'] = block_num
+                    
+                    transactions = (block_data or {}).get('transactions') or [{}]
+                    await self._record_progress(
+                        'ethereum', block_num, transactions[-1].get('hash'),
+                        int(block_data['timestamp'], 16) if block_data else None
+                    )
+        finally:
+            for task in in_flight:
+                task.cancel()
+    
+    async def _fetch_ethereum_blocks(self, session: aiohttp.ClientSession, config: Dict,
+                                     block_nums: List[int]) -> List:
+        """
+        Get several blocks with one JSON-RPC batch request, in block order.
+        
+        Blocks the node answers with an error or a null result (e.g. one it
+        has not imported yet) are requested again, up to `max_retries`
+        times; if any is still missing the fetch fails, so the checkpoint
+        never moves past a block that was not processed.
+        """
+        monitoring = self.config['monitoring']
+        fetched = {}
+        pending = list(block_nums)
+        
+        for attempt in range(monitoring.get('max_retries', 3) + 1):
+            if attempt:
+                await asyncio.sleep(monitoring.get('retry_delay', 5))
+            
+            payload = [
+                {
+                    "jsonrpc": "2.0",
+                    "method": "eth_getBlockByNumber",
+                    "params": [hex(block_num), True],
+                    "id": block_num
+                }
+                for block_num in pending
+            ]
+            
+            async with session.post(config['rest_api'], json=payload) as response:
+                data = await response.json()
+            
+            # Batch responses may come back in any order
+            if isinstance(data, dict):
+                raise RuntimeError(f"JSON-RPC batch request failed: {data.get('error')}")
+            for item in data:
+                if item.get('id') in pending and item.get('result') is not None:
+                    fetched[item['id']] = item['result']
+            
+            pending = [block_num for block_num in pending if block_num not in fetched]
+            if not pending:
+                return [(block_num, fetched[block_num]) for block_num in block_nums]
+            
+            errors = {item.get('id'): item.get('error') for item in data if item.get('id') in pending}
+            self.logger.warning(
+                f"Ethereum blocks {pending} not returned (attempt {attempt + 1}): "
+                f"{[errors.get(block_num) or 'null result' for block_num in pending]}"
+            )
+        
+        raise RuntimeError(f"Failed to fetch Ethereum blocks {pending}")
+    
+    def _give_up_on_block(self, connection_info: Dict, block_num: int) -> bool:
+        """Count a failed attempt at `block_num`; True once retries are exhausted"""
+        if connection_info['failed_block'] != block_num:
+            connection_info['failed_block'] = block_num
+            connection_info['block_failures'] = 0
+        connection_info['block_failures'] += 1
+        
+        if connection_info['block_failures'] <= self.config['monitoring'].get('max_retries', 3):
+            return False
+        
+        self.logger.error(
+            f"Skipping Ethereum block {block_num} after {connection_info['block_failures']} failed attempts"
+        )
+        connection_info['failed_block'] = None
+        connection_info['skipped_blocks'] += 1
+        return True
+    
     async def _process_ethereum_block(self, session: aiohttp.ClientSession, config: Dict, block_num: int):
         """Process Ethereum block transactions"""
         try:
@@ -238,32 +656,58 @@ class BlockchainMonitor:
             
             async with session.post(config['rest_api'], json=payload) as response:
                 data = await response.json()
-                block_data = data.get('result')
-                
-                if not block_data or not block_data.get('transactions'):
-                    return
+            
+            if self.recorder is not None:
+                self.recorder.record_ethereum_block(block_num, data.get('result'))
+            await self._process_ethereum_block_data(block_num, data.get('result'))
+        
+        except Exception as e:
+            self.logger.error(f"Error processing Ethereum block {block_num}: {e}")
+    
+    async def _process_ethereum_block_data(self, block_num: int, block_data: Optional[Dict]) -> bool:
+        """
+        Process the transactions of a fetched Ethereum block.
+        
+        Returns False if the block or any of its transactions failed, so the
+        caller can retry it; transactions already queued are skipped then.
+        """
+        try:
+            if not block_data or not block_data.get('transactions'):
+                return True
+            
+            transactions = block_data['transactions']
+            
+            # Blocks re-read after a restart may have been scored already
+            dedup_until = self.network_connections.get('ethereum', {}).get('dedup_until')
+            if dedup_until is not None and block_num <= dedup_until:
+                scored = await self._already_scored([tx['hash'] for tx in transactions])
+                self.network_connections['ethereum']['deduplicated'] += len(scored)
+                transactions = [tx for tx in transactions if tx['hash'] not in scored]
+            
+            # Filter the whole block at once, then process what passed
+            timestamp = int(block_data['timestamp'], 16)
+            processed = True
+            for tx, value, tx_type in self.transaction_filter.filter_block(transactions):
+                analyzed_tx = {
+                    'tx_hash': tx['hash'],
+                    'amount': value / 1e18,  # Convert wei to ETH
+                    'sender': tx['from'],
+                    'receiver': tx['to'],
+                    'timestamp': timestamp,
+                    'network': 'ethereum',
+                    'tx_type': tx_type,
+                    'gas_fee': int(tx.get('gasPrice', '0x0'), 16) * int(tx.get('gas', '0x0'), 16) / 1e18,
+                    'block_height': block_num,
+                    'confirmations': 1
+                }
                 
-                # Process each transaction in the block
-                for tx in block_data['transactions']:
-                    if self._should_analyze_transaction(tx):
-                        analyzed_tx = {
-                            'tx_hash': tx['hash'],
-                            'amount': int(tx.get('value', '0x0'), 16) / 1e18,  # Convert wei to ETH
-                            'sender': tx['from'],
-                            'receiver': tx['to'],
-                            'timestamp': int(block_data['timestamp'], 16),
-                            'network': 'ethereum',
-                            'tx_type': 'transfer',
-                            'gas_fee': int(tx.get('gasPrice', '0x0'), 16) * int(tx.get('gas', '0x0'), 16) / 1e18,
-                            'block_height': block_num,
-                            'confirmations': 1
-                        }
-                        
-                        # Send to fraud detection
-                        await self._send_for_analysis(analyzed_tx)
+                # Send to fraud detection
+                processed = await self._send_for_analysis(analyzed_tx) and processed
+            return processed
         
         except Exception as e:
             self.logger.error(f"Error processing Ethereum block {block_num}: {e}")
+            return False
     
     async def _get_ethereum_latest_block(self, session: aiohttp.ClientSession, config: Dict) -> int:
         """Get latest Ethereum block number"""
@@ -279,28 +723,14 @@ class BlockchainMonitor:
             return int(data['result'], 16)
     
     def _should_analyze_transaction(self, tx_data: Dict) -> bool:
-        """Check if transaction should be analyzed"""
-        filters = self.config['filters']
-        
-        # Check amount filters
-        amount = tx_data.get('value', 0)
-        if isinstance(amount, str):
-            amount = int(amount, 16) if amount.startswith('0x') else float(amount)
-        
-        if amount < filters['min_amount']:
-            return False
-        
-        if filters['max_amount'] and amount > filters['max_amount']:
-            return False
-        
-        # Check address filters
-        sender = tx_data.get('from') or self._extract_sender(tx_data.get('inputs', []))
-        receiver = tx_data.get('to') or tx_data.get('script')
+        """Check if a single transaction (or Hathor output) should be analyzed"""
+        if 'from' in tx_data:
+            return bool(self.transaction_filter.filter_block([tx_data]))
         
-        if sender in filters['exclude_addresses'] or receiver in filters['exclude_addresses']:
-            return False
-        
-        return True
+        sender = self._extract_sender(tx_data.get('inputs', []))
+        return self.transaction_filter.allows(
+            'hathor', tx_data.get('value', 0), sender, tx_data.get('script')
+        )
     
     def _extract_sender(self, inputs: List[Dict]) -> str:
         """Extract sender address from transaction inputs"""
@@ -311,24 +741,62 @@ class BlockchainMonitor:
         first_input = inputs[0]
         return first_input.get('script') or first_input.get('address', "unknown")
     
-    async def _send_for_analysis(self, transaction: Dict):
-        """Send transaction to fraud detection system"""
+    async def _send_for_analysis(self, transaction: Dict) -> bool:
+        """Send transaction to fraud detection system; False if it failed"""
         try:
+            # Each transaction is analyzed once, however often it is delivered
+            # (Hathor outputs are already folded into one record per hash)
+            if transaction['tx_hash'] in self.dedup_filter:
+                return True
+            
             # Store transaction data in Redis for processing
             tx_key = f"pending_analysis:{transaction['tx_hash']}"
-            self.redis_client.setex(tx_key, 300, json.dumps(transaction))  # 5 min TTL
+            summary = {key: value for key, value in transaction.items() if key != 'outputs'}
+            self.cache.setex(tx_key, 300, json.dumps(summary))  # 5 min TTL
             
-            # Notify callbacks
-            for callback in self.callbacks:
-                try:
-                    await callback(transaction)
-                except Exception as e:
-                    self.logger.error(f"Callback error: {e}")
+            # Update sender velocity before scoring so the features include it
+            if self.feature_store is not None:
+                self.feature_store.update(
+                    transaction['sender'], transaction['amount'], transaction['timestamp']
+                )
+            if self.risk_engine is not None:
+                for output in transaction.get('outputs') or [transaction]:
+                    self.risk_engine.record_transaction(
+                        transaction['sender'], output['receiver'],
+                        output['amount'], transaction['timestamp']
+                    )
+            
+            # Freeze the address history as of ingestion; looked up at scoring
+            # time it would include later transactions still in the queue
+            if self.feature_store is not None or self.risk_engine is not None:
+                transaction['history'] = snapshot_history(transaction, self.feature_store, self.risk_engine)
+            
+            # Hand off to the analysis consumers; only a queued transaction
+            # counts as seen, so one that failed before this is retried
+            await self.ingestion_queue.put(transaction)
+            self.dedup_filter.add(transaction['tx_hash'])
             
             self.logger.debug(f"Transaction queued for analysis: {transaction['tx_hash']}")
+            return True
         
         except Exception as e:
             self.logger.error(f"Error sending transaction for analysis: {e}")
+            return False
+    
+    async def _dispatch(self, batch: List[Dict]):
+        """Notify callbacks with a batch pulled off the ingestion queue"""
+        for callback in self.batch_callbacks:
+            try:
+                await callback(batch)
+            except Exception as e:
+                self.logger.error(f"Batch callback error: {e}")
+        
+        for transaction in batch:
+            for callback in self.callbacks:
+                try:
+                    await callback(transaction)
+                except Exception as e:
+                    self.logger.error(f"Callback error: {e}")
     
     async def _health_check_loop(self):
         """Periodic health check for all network connections"""
@@ -336,20 +804,34 @@ class BlockchainMonitor:
             try:
                 health_status = {}
                 
+                # Pick up edits to the exclude-address file
+                if await asyncio.to_thread(self.transaction_filter.reload_if_changed):
+                    self.logger.info("Transaction filters reloaded")
+                
                 for network, conn_info in self.network_connections.items():
+                    # Persist scoring progress made since the last position
+                    await self._save_checkpoint(network)
                     health_status[network] = {
                         'status': conn_info['status'],
                         'last_block': conn_info['last_block'],
-                        'connected': conn_info['connection'] is not None
+                        'connected': conn_info['connection'] is not None,
+                        'checkpoint': conn_info['checkpoint'],
+                        'deduplicated': conn_info['deduplicated'],
+                        'skipped_blocks': conn_info['skipped_blocks'],
+                        'http': conn_info['timings'].get_stats()
                     }
                 
                 # Store health status in Redis
-                self.redis_client.setex(
+                await self.redis_client.setex(
                     'monitor_health',
                     120,  # 2 min TTL
                     json.dumps({
                         'timestamp': datetime.now().isoformat(),
                         'networks': health_status,
+                        'ingestion': self.ingestion_queue.get_metrics(),
+                        'dedup': self.dedup_filter.get_stats(),
+                        'filters': self.transaction_filter.get_stats(),
+                        'recording': self.recorder.get_stats() if self.recorder is not None else None,
                         'monitoring_active': self.is_monitoring
                     })
                 )
@@ -361,10 +843,10 @@ class BlockchainMonitor:
             
             await asyncio.sleep(self.config['monitoring']['health_check_interval'])
     
-    def get_monitoring_stats(self) -> Dict:
+    async def get_monitoring_stats(self) -> Dict:
         """Get current monitoring statistics"""
         try:
-            health_data = self.redis_client.get('monitor_health')
+            health_data = await self.redis_client.get('monitor_health')
             if health_data:
                 return json.loads(health_data)
             
@@ -373,7 +855,8 @@ class BlockchainMonitor:
                 'networks': {
                     network: {
                         'status': info['status'],
-                        'last_block': info['last_block']
+                        'last_block': info['last_block'],
+                        'http': info['timings'].get_stats()
                     }
                     for network, info in self.network_connections.items()
                 }
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+from typing import Dict, Optional
+
+
+class CheckpointStore:
+    """
+    Durable per-network monitor position.
+
+    A checkpoint records the last processed block, transaction hash and
+    timestamp of a network. With the 'redis' backend each network's
+    checkpoint is one JSON string written with a single SET; with the 'file'
+    backend it is `{path}/{network}.json`, written to a temporary file and
+    renamed into place, so a crash never leaves a torn checkpoint behind.
+    """
+
+    def __init__(self, backend: str = 'redis', redis_client=None, path: str = './checkpoints',
+                 key_prefix: str = 'monitor:checkpoint:'):
+        if backend not in ('redis', 'file'):
+            raise ValueError(f"Unknown checkpoint backend: {backend}")
+        if backend == 'redis' and redis_client is None:
+            raise ValueError("The redis checkpoint backend requires a redis_client")
+
+        self.backend = backend
+        self.redis_client = redis_client
+        self.path = path
+        self.key_prefix = key_prefix
+
+    async def save(self, network: str, checkpoint: Dict):
+        """Atomically replace the checkpoint of `network`"""
+        data = json.dumps(checkpoint)
+        if self.backend == 'redis':
+            await self.redis_client.set(f"{self.key_prefix}{network}", data)
+        else:
+            await asyncio.to_thread(self._write_file, network, data)
+
+    async def load(self, network: str) -> Optional[Dict]:
+        """The last saved checkpoint of `network`, or None"""
+        if self.backend == 'redis':
+            data = await self.redis_client.get(f"{self.key_prefix}{network}")
+        else:
+            data = await asyncio.to_thread(self._read_file, network)
+        return json.loads(data) if data else None
+
+    def _file(self, network: str) -> str:
+        return os.path.join(self.path, f"{network}.json")
+
+    def _write_file(self, network: str, data: str):
+        os.makedirs(self.path, exist_ok=True)
+        filepath = self._file(network)
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+
+    def _read_file(self, network: str) -> Optional[str]:
+        try:
+            with open(self._file(network)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
@@ -114,6 +114,13 @@ class AddressProfile(BaseModel):
     is_mixer: bool = Field(default=False, description="Known mixer address")
     reputation_score: Optional[float] = Field(default=None, description="Reputation score")
 
+class LabelFeedback(BaseModel):
+    address: str = Field(..., description="Address the label applies to")
+    is_fraud: bool = Field(..., description="Confirmed fraud (true) or cleared (false)")
+    tx_hash: Optional[str] = Field(default=None, description="Transaction the label was confirmed on")
+    timestamp: Optional[float] = Field(default=None, description="Time of the confirmed activity")
+    source: str = Field(default="analyst", description="Label source, e.g. analyst or chargeback")
+
 class TrainingData(BaseModel):
     features: Dict[str, List[float]] = Field(..., description="Training features")
     labels: List[int] = Field(..., description="Training labels")
@@ -0,0 +1,117 @@
+import hashlib
+import math
+import time
+from typing import Dict, List, Optional
+
+
+class _BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.n_bits = max(64, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.n_hashes = max(1, int(round(self.n_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        self.count = 0
+        self.created = time.monotonic()
+
+    def positions(self, key: str) -> List[int]:
+        # Double hashing: k positions from two independent 64-bit hashes
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def contains(self, positions: List[int]) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def add(self, positions: List[int]):
+        bits = self.bits
+        for p in positions:
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class RotatingBloomFilter:
+    """
+    Memory-bounded "seen before" filter over transaction keys.
+
+    Two Bloom filter generations are kept: keys are added to the current
+    one and looked up in both. The current generation becomes the previous
+    one (and the old previous one is dropped) once it holds `capacity` keys
+    or is `window_seconds` old, so a key is remembered for at least one full
+    generation while memory stays fixed. Each generation is sized for half
+    of `error_rate`, keeping the false-positive probability of a lookup
+    against both within the budget. A false positive means a new
+    transaction is wrongly treated as a duplicate.
+    """
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001,
+                 window_seconds: Optional[float] = 3600):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+
+        self._current = _BloomFilter(capacity, error_rate / 2)
+        self._previous: Optional[_BloomFilter] = None
+
+        # Metrics
+        self.checked = 0
+        self.duplicates = 0
+        self.rotations = 0
+
+    def seen(self, key: str) -> bool:
+        """Return True if `key` was seen before, otherwise remember it"""
+        if key in self:
+            return True
+        self.add(key)
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        """Check `key` without remembering it"""
+        self._maybe_rotate()
+        self.checked += 1
+
+        # Generations are sized alike, so positions are shared
+        positions = self._current.positions(key)
+        if self._current.contains(positions) or (
+            self._previous is not None and self._previous.contains(positions)
+        ):
+            self.duplicates += 1
+            return True
+        return False
+
+    def add(self, key: str):
+        """Remember `key`"""
+        self._current.add(self._current.positions(key))
+
+    def _maybe_rotate(self):
+        expired = (
+            self.window_seconds is not None
+            and time.monotonic() - self._current.created >= self.window_seconds
+        )
+        if self._current.count >= self.capacity or expired:
+            self._previous = self._current
+            self._current = _BloomFilter(self.capacity, self.error_rate / 2)
+            self.rotations += 1
+
+    def _false_positive_rate(self, bloom: Optional[_BloomFilter]) -> float:
+        if bloom is None:
+            return 0.0
+        return (1 - math.exp(-bloom.n_hashes * bloom.count / bloom.n_bits)) ** bloom.n_hashes
+
+    def get_stats(self) -> Dict:
+        """Get duplicate and occupancy statistics"""
+        current_fp = self._false_positive_rate(self._current)
+        previous_fp = self._false_positive_rate(self._previous)
+        return {
+            'checked': self.checked,
+            'duplicates': self.duplicates,
+            'duplicate_rate': self.duplicates / self.checked if self.checked else 0,
+            'current_keys': self._current.count,
+            'previous_keys': self._previous.count if self._previous is not None else 0,
+            'rotations': self.rotations,
+            'false_positive_budget': self.error_rate,
+            'estimated_false_positive_rate': 1 - (1 - current_fp) * (1 - previous_fp),
+            'memory_bytes': len(self._current.bits) + (
+                len(self._previous.bits) if self._previous is not None else 0
+            )
+        }
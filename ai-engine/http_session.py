@@ -0,0 +1,120 @@
+import time
+from typing import Dict
+
+import aiohttp
+
+DEFAULT_HTTP_CONFIG = {
+    'pool_size': 20,            # connections kept per session
+    'pool_size_per_host': 10,
+    'keepalive_timeout': 60,    # seconds an idle connection is kept open
+    'dns_ttl': 300,             # seconds resolved hosts are cached
+    'connect_timeout': 5,
+    'read_timeout': 20,
+    'total_timeout': 30
+}
+
+
+class RequestTimings:
+    """
+    aiohttp trace hooks splitting request time into connect and transfer.
+
+    `connect` covers DNS, TCP and TLS for requests that had to open a new
+    connection; `transfer` is the rest, from sending the request until the
+    response headers arrived. Requests served on a pooled keep-alive
+    connection only contribute transfer time.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.failed_requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.dns_cache_hits = 0
+        self.dns_lookups = 0
+        self.total_connect_time = 0.0
+        self.total_transfer_time = 0.0
+        self.max_connect_time = 0.0
+        self.max_transfer_time = 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_start.append(self._on_connection_create_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_resolvehost_end)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        return trace_config
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.started = time.perf_counter()
+        ctx.connect_time = 0.0
+
+    async def _on_connection_create_start(self, session, ctx, params):
+        ctx.connect_started = time.perf_counter()
+
+    async def _on_connection_create_end(self, session, ctx, params):
+        ctx.connect_time = time.perf_counter() - ctx.connect_started
+        self.new_connections += 1
+        self.total_connect_time += ctx.connect_time
+        self.max_connect_time = max(self.max_connect_time, ctx.connect_time)
+
+    async def _on_connection_reuseconn(self, session, ctx, params):
+        self.reused_connections += 1
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        self.dns_cache_hits += 1
+
+    async def _on_dns_resolvehost_end(self, session, ctx, params):
+        self.dns_lookups += 1
+
+    async def _on_request_end(self, session, ctx, params):
+        transfer = time.perf_counter() - ctx.started - ctx.connect_time
+        self.requests += 1
+        self.total_transfer_time += transfer
+        self.max_transfer_time = max(self.max_transfer_time, transfer)
+
+    async def _on_request_exception(self, session, ctx, params):
+        self.failed_requests += 1
+
+    def get_stats(self) -> Dict:
+        """Get connection and timing statistics"""
+        return {
+            'requests': self.requests,
+            'failed_requests': self.failed_requests,
+            'new_connections': self.new_connections,
+            'reused_connections': self.reused_connections,
+            'dns_lookups': self.dns_lookups,
+            'dns_cache_hits': self.dns_cache_hits,
+            'avg_connect_ms': (
+                self.total_connect_time / self.new_connections * 1000 if self.new_connections else 0
+            ),
+            'max_connect_ms': self.max_connect_time * 1000,
+            'avg_transfer_ms': self.total_transfer_time / self.requests * 1000 if self.requests else 0,
+            'max_transfer_ms': self.max_transfer_time * 1000
+        }
+
+
+def create_session(config: Dict, timings: RequestTimings) -> aiohttp.ClientSession:
+    """Long-lived client session with a tuned, keep-alive connection pool"""
+    config = {**DEFAULT_HTTP_CONFIG, **(config or {})}
+
+    connector = aiohttp.TCPConnector(
+        limit=config['pool_size'],
+        limit_per_host=config['pool_size_per_host'],
+        keepalive_timeout=config['keepalive_timeout'],
+        ttl_dns_cache=config['dns_ttl'],
+        use_dns_cache=True
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=config['total_timeout'],
+        sock_connect=config['connect_timeout'],
+        sock_read=config['read_timeout']
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        trace_configs=[timings.trace_config()]
+    )
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from fraud_detector import FraudDetector
+
+# Detector owned by each process-pool worker, loaded once by the initializer
+_worker_detector: Optional[FraudDetector] = None
+
+
+def _init_worker(model_path: str, mmap_model: bool):
+    global _worker_detector
+    _worker_detector = FraudDetector(model_path, mmap_model=mmap_model)
+
+
+def _worker_predict_batch(transactions: List[Dict]) -> List[Dict]:
+    return _worker_detector.predict_batch(transactions)
+
+
+class InferencePoolFull(asyncio.QueueFull):
+    """Raised when the pool already has its maximum number of jobs pending"""
+
+
+class InferencePool:
+    """
+    Runs FraudDetector scoring off the event loop.
+
+    In 'thread' mode batches run on a thread pool against the shared
+    detector; in 'process' mode each worker process loads the model from
+    `model_path` once at startup (with `mmap_model` the workers map the
+    flat serving arrays and share their pages). Admission control rejects
+    new jobs with InferencePoolFull once `max_workers + max_pending` jobs
+    are in flight, which keeps queueing delay (and so tail latency) bounded.
+    """
+
+    def __init__(
+        self,
+        detector: FraudDetector,
+        mode: str = 'thread',
+        max_workers: int = 2,
+        max_pending: int = 32,
+        model_path: Optional[str] = None,
+        mmap_model: bool = False
+    ):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Unknown inference pool mode: {mode}")
+        if mode == 'process' and not model_path:
+            raise ValueError("Process mode requires a model_path for the workers")
+
+        self.logger = logging.getLogger(__name__)
+        self.detector = detector
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.model_path = model_path
+        self.mmap_model = mmap_model
+        self.executor = self._create_executor()
+
+        # Metrics
+        self.in_flight = 0
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+        self.rejected_jobs = 0
+        self.total_run_time = 0.0
+
+    def _create_executor(self) -> Executor:
+        if self.mode == 'process':
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.model_path, self.mmap_model)
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='inference')
+
+    async def predict_batch(self, transactions: List[Dict]) -> List[Dict]:
+        """
+        Score a batch on the pool.
+
+        Raises InferencePoolFull when the pool is saturated.
+        """
+        if self.in_flight >= self.max_workers + self.max_pending:
+            self.rejected_jobs += 1
+            raise InferencePoolFull("Inference pool is saturated")
+
+        loop = asyncio.get_running_loop()
+        if self.mode == 'process':
+            # Workers have no access to the in-process address stores, so
+            # ship their values along with the transactions
+            transactions = [
+                tx if 'history' in tx else {**tx, 'history': self.detector.lookup_history(tx)}
+                for tx in transactions
+            ]
+            call = (_worker_predict_batch, transactions)
+        else:
+            call = (self.detector.predict_batch, transactions)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            results = await loop.run_in_executor(self.executor, *call)
+        except Exception:
+            self.failed_jobs += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_run_time += time.perf_counter() - started
+
+        self.completed_jobs += 1
+        return results
+
+    def reload_model(self, detector: Optional[FraudDetector] = None):
+        """
+        Make workers pick up a newly trained model.
+
+        Thread workers score with `detector`, which replaces the current one
+        in a single assignment; process workers are replaced and load the
+        model saved at `model_path`. Jobs already running finish on the old
+        detector or pool.
+        """
+        if detector is not None:
+            self.detector = detector
+        if self.mode != 'process':
+            return
+
+        old_executor = self.executor
+        self.executor = self._create_executor()
+        old_executor.shutdown(wait=False)
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_metrics(self) -> Dict:
+        """Get worker pool statistics"""
+        finished = self.completed_jobs + self.failed_jobs
+        return {
+            'mode': self.mode,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'in_flight': self.in_flight,
+            'completed_jobs': self.completed_jobs,
+            'failed_jobs': self.failed_jobs,
+            'rejected_jobs': self.rejected_jobs,
+            'avg_job_time_ms': self.total_run_time / finished * 1000 if finished else 0
+        }
@@ -0,0 +1,307 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+FULL_POLICIES = ('block', 'drop_oldest', 'spill')
+
+
+class IngestionQueue:
+    """
+    Bounded queue decoupling blockchain ingestion from analysis.
+
+    Producers `put` transactions and return as soon as they are queued;
+    `consumers` tasks pull them in batches of up to `batch_size` (waiting at
+    most `max_wait_ms` to fill one) and hand each batch to `handler`. When
+    the queue is full the policy decides what gives:
+
+    - 'block': the producer waits, pushing backpressure to the source
+    - 'drop_oldest': the oldest queued transaction is discarded
+    - 'spill': the transaction is appended to a Redis list and read back
+      once the consumers have caught up
+
+    End-to-end lag is measured from each transaction's block `timestamp` to
+    the moment its batch has been handled.
+
+    Transactions left in the spill list by an earlier process are restored
+    on start; `already_handled`, an async callable returning which of the
+    given tx hashes need no scoring, lets those that were meanwhile scored
+    (e.g. by a checkpoint replay) be skipped.
+
+    Every transaction gets a sequence number when it is put. Consumers
+    finish batches out of order, so `completed_through()` reports the
+    highest sequence number up to which every transaction has been handled
+    (or dropped by policy), letting callers checkpoint only what is done.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Dict]], Awaitable[None]],
+        max_size: int = 10000,
+        consumers: int = 2,
+        batch_size: int = 100,
+        max_wait_ms: float = 50.0,
+        full_policy: str = 'block',
+        redis_client=None,
+        spill_key: str = 'ingestion:spill',
+        already_handled: Optional[Callable[[List[str]], Awaitable[set]]] = None
+    ):
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"Unknown full-queue policy: {full_policy}")
+        if full_policy == 'spill' and redis_client is None:
+            raise ValueError("The spill policy requires a redis_client")
+
+        self.logger = logging.getLogger(__name__)
+        self.handler = handler
+        self.max_size = max_size
+        self.consumers = consumers
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.full_policy = full_policy
+        self.redis_client = redis_client
+        self.spill_key = spill_key
+        self.already_handled = already_handled
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._spilled_pending = 0
+        self._unspilling = False
+        # Sequence numbers put but not yet handled, as a heap with lazy deletion
+        self._outstanding: List[int] = []
+        self._done = set()
+        # Spilled transactions outlive the process; only track this run's
+        self._run_id = os.urandom(4).hex()
+
+        # Metrics
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.skipped = 0
+        self.failed_batches = 0
+        self.total_batches = 0
+        self.lags = deque(maxlen=10000)  # seconds from block timestamp to handled
+        self.max_lag = 0.0
+
+    async def start(self):
+        """Start the consumer tasks on the running event loop"""
+        if self._workers:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [asyncio.create_task(self._consume()) for _ in range(self.consumers)]
+
+        # Pick up what an earlier process spilled and never read back
+        if self.full_policy == 'spill':
+            try:
+                self._spilled_pending = await self.redis_client.llen(self.spill_key)
+            except Exception as e:
+                self.logger.error(f"Failed to read the spill backlog: {e}")
+            if self._spilled_pending:
+                self.logger.info(f"Restoring {self._spilled_pending} spilled transactions")
+                await self._try_unspill()
+
+    async def stop(self):
+        """Stop the consumers; transactions still queued are discarded"""
+        if not self._workers:
+            return
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._queue.qsize():
+            self.logger.warning(f"Discarding {self._queue.qsize()} queued transactions on stop")
+            self.dropped += self._queue.qsize()
+
+    async def join(self):
+        """Wait until every transaction queued so far has been handled"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def completed_through(self) -> int:
+        """Highest sequence number up to which every transaction is handled"""
+        while self._outstanding and self._outstanding[0] in self._done:
+            self._done.remove(heapq.heappop(self._outstanding))
+        return self._outstanding[0] - 1 if self._outstanding else self.enqueued
+
+    def _complete(self, seq: Optional[int]):
+        if seq is not None:
+            self._done.add(seq)
+
+    async def put(self, transaction: Dict):
+        """Queue a transaction, applying the full-queue policy"""
+        if not self._workers:
+            raise RuntimeError("Ingestion queue is not running")
+
+        self.enqueued += 1
+        seq = self.enqueued
+        heapq.heappush(self._outstanding, seq)
+        if self.full_policy == 'block':
+            await self._queue.put((seq, transaction))
+            return
+
+        if self._queue.full():
+            if self.full_policy == 'drop_oldest':
+                dropped_seq, _ = self._queue.get_nowait()
+                self._queue.task_done()
+                self._complete(dropped_seq)
+                self.dropped += 1
+            else:
+                await self.redis_client.rpush(
+                    self.spill_key, json.dumps({'run': self._run_id, 'seq': seq, 'tx': transaction})
+                )
+                self._spilled_pending += 1
+                self.spilled += 1
+                return
+        self._queue.put_nowait((seq, transaction))
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._handle([transaction for _, transaction in batch])
+            finally:
+                for seq, _ in batch:
+                    self._complete(seq)
+                    self._queue.task_done()
+
+            if self._spilled_pending and self._queue.empty():
+                await self._try_unspill()
+
+    async def _handle(self, batch: List[Dict]):
+        try:
+            await self.handler(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            if len(batch) == 1:
+                self.logger.error(f"Ingestion handler error: {e}")
+                return
+            # Isolate the failing transaction instead of losing the batch
+            self.logger.warning(f"Ingestion batch handler error, retrying transactions individually: {e}")
+            for transaction in batch:
+                await self._handle([transaction])
+            return
+
+        now = time.time()
+        self.total_batches += 1
+        self.processed += len(batch)
+        for transaction in batch:
+            timestamp = transaction.get('timestamp')
+            if timestamp:
+                lag = now - float(timestamp)
+                self.lags.append(lag)
+                self.max_lag = max(self.max_lag, lag)
+
+    async def _try_unspill(self):
+        if self._unspilling:
+            return
+        self._unspilling = True
+        try:
+            await self._unspill()
+        except Exception as e:
+            self.logger.error(f"Failed to restore spilled transactions: {e}")
+        finally:
+            self._unspilling = False
+
+    async def _unspill(self):
+        """Move spilled transactions back into the queue while there is room"""
+        try:
+            raw = await self.redis_client.lpop(self.spill_key, self.batch_size)
+        except Exception as e:
+            self.logger.error(f"Failed to read spilled transactions: {e}")
+            return
+        if not raw:
+            self._spilled_pending = 0
+            return
+
+        entries = []
+        for raw_item in raw:
+            try:
+                item = json.loads(raw_item)
+            except ValueError:
+                self.logger.error(f"Discarding malformed spilled transaction: {raw_item[:100]!r}")
+                self._spilled_pending -= 1
+                self.dropped += 1
+                continue
+            if 'run' not in item:
+                item = {'run': None, 'seq': None, 'tx': item}  # spilled by an older version
+            seq = item['seq'] if item['run'] == self._run_id else None
+            entries.append((raw_item, seq, item['tx']))
+
+        # A restart's checkpoint replay may have scored these in the meantime
+        if self.already_handled is not None and entries:
+            try:
+                handled = await self.already_handled([tx.get('tx_hash') for _, _, tx in entries])
+            except Exception as e:
+                # Scoring twice beats losing what was popped
+                self.logger.warning(f"Failed to check spilled transactions for predictions: {e}")
+                handled = set()
+            if handled:
+                for _, seq, tx in entries:
+                    if tx.get('tx_hash') in handled:
+                        self._spilled_pending -= 1
+                        self._complete(seq)
+                        self.skipped += 1
+                entries = [entry for entry in entries if entry[2].get('tx_hash') not in handled]
+
+        # Producers may have filled the queue while reading the spill list
+        for index, (_, seq, transaction) in enumerate(entries):
+            if self._queue.full():
+                await self.redis_client.lpush(
+                    self.spill_key, *reversed([raw_item for raw_item, _, _ in entries[index:]])
+                )
+                break
+            self._spilled_pending -= 1
+            self._queue.put_nowait((seq, transaction))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def get_metrics(self) -> Dict:
+        """Get ingestion statistics"""
+        lags_ms = np.array(self.lags) * 1000
+        return {
+            'full_policy': self.full_policy,
+            'max_size': self.max_size,
+            'queue_depth': self.queue_depth,
+            'consumers': len(self._workers),
+            'enqueued': self.enqueued,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'spill_skipped': self.skipped,
+            'spill_backlog': self._spilled_pending,
+            'failed_batches': self.failed_batches,
+            'avg_batch_size': self.processed / self.total_batches if self.total_batches else 0,
+            'lag_p50_ms': float(np.percentile(lags_ms, 50)) if len(lags_ms) else 0,
+            'lag_p99_ms': float(np.percentile(lags_ms, 99)) if len(lags_ms) else 0,
+            'max_lag_ms': self.max_lag * 1000
+        }
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+
+class MicroBatcher:
+    """
+    Collects concurrent scoring requests into small batches.
+
+    Requests wait in a bounded queue until either `max_batch_size` of them
+    are pending or the oldest has waited `max_delay_ms`; the batch is then
+    scored with one awaited call to `score_batch` and every request's future
+    is resolved with its own result. Batches are scored concurrently, so the
+    scorer (e.g. an InferencePool) bounds how many run at once.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Dict]], Awaitable[List[Dict]]],
+        max_batch_size: int = 64,
+        max_delay_ms: float = 5.0,
+        max_queue_size: int = 1024
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.total_requests = 0
+        self.rejected_requests = 0
+        self.total_batches = 0
+        self.batched_requests = 0
+        self.max_batch_seen = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    async def start(self):
+        """Start the batching worker on the running event loop"""
+        if self._worker is not None:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and fail any requests still queued"""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        for task in list(self._batch_tasks):
+            task.cancel()
+
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, item: Dict) -> Any:
+        """
+        Queue one item for scoring and wait for its result.
+
+        Raises asyncio.QueueFull when the queue is at capacity.
+        """
+        if self._worker is None:
+            raise RuntimeError("Micro-batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected_requests += 1
+            raise
+
+        self.total_requests += 1
+        return await future
+
+    async def _run(self):
+        """Form batches from the queue and score them"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self._record_batch(batch, time.perf_counter())
+            task = asyncio.create_task(self._process_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _process_batch(self, batch: List):
+        """Score one batch and resolve its futures"""
+        items = [item for item, _, _ in batch]
+        try:
+            results = await self.score_batch(items)
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            if len(batch) > 1 and not isinstance(e, asyncio.QueueFull):
+                # Isolate the failing request instead of failing the batch
+                self.logger.warning(f"Batch scoring error, retrying items individually: {e}")
+                for entry in batch:
+                    await self._process_batch([entry])
+                return
+
+            if isinstance(e, asyncio.QueueFull):
+                self.logger.warning(f"Batch rejected: {e}")
+            else:
+                self.logger.error(f"Batch scoring error: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record_batch(self, batch: List, started: float):
+        self.total_batches += 1
+        self.batched_requests += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+        for _, _, enqueued in batch:
+            wait = started - enqueued
+            self.total_queue_wait += wait
+            self.max_queue_wait = max(self.max_queue_wait, wait)
+
+    def get_metrics(self) -> Dict:
+        """Get batching statistics"""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_delay_ms': self.max_delay * 1000,
+            'max_queue_size': self.max_queue_size,
+            'queue_depth': self.queue_depth,
+            'batches_in_flight': len(self._batch_tasks),
+            'total_requests': self.total_requests,
+            'rejected_requests': self.rejected_requests,
+            'total_batches': self.total_batches,
+            'avg_batch_size': self.batched_requests / self.total_batches if self.total_batches else 0,
+            'max_batch_seen': self.max_batch_seen,
+            'avg_queue_wait_ms': (
+                self.total_queue_wait / self.batched_requests * 1000 if self.batched_requests else 0
+            ),
+            'max_queue_wait_ms': self.max_queue_wait * 1000
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
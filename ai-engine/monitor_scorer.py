@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from prediction_index import PredictionIndex
+
+
+class MonitorScorer:
+    """
+    Batch callback that scores what BlockchainMonitor ingests.
+
+    Register with `BlockchainMonitor.add_batch_callback`. Each batch pulled
+    off the ingestion queue is scored with one `score_batch` call (e.g.
+    InferencePool.predict_batch) and the results take the same route as
+    /predict: the write-behind prediction cache and alert index, and the
+    rolling prediction stats. Verdicts are not fed back into address
+    reputation; only confirmed labels are (see /feedback).
+
+    When the scorer is saturated the batch is retried after `retry_delay`
+    seconds instead of dropped, which holds up the ingestion consumers and
+    lets the queue's full-queue policy take effect. If a batch fails
+    otherwise, its transactions are scored one by one so a single malformed
+    one only costs itself.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Dict]], Awaitable[List[Dict]]],
+        prediction_index: PredictionIndex,
+        prediction_stats=None,
+        retry_delay: float = 0.05
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.score_batch = score_batch
+        self.prediction_index = prediction_index
+        self.prediction_stats = prediction_stats
+        self.retry_delay = retry_delay
+
+        # Metrics
+        self.scored = 0
+        self.fraud_detected = 0
+        self.batches = 0
+        self.throttled = 0
+        self.failed = 0
+        self.total_score_time = 0.0
+
+    async def _score(self, batch: List[Dict]) -> List[Dict]:
+        while True:
+            try:
+                return await self.score_batch(batch)
+            except asyncio.QueueFull:
+                self.throttled += 1
+                await asyncio.sleep(self.retry_delay)
+
+    async def __call__(self, batch: List[Dict]):
+        started = time.perf_counter()
+        try:
+            results = await self._score(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                raise
+            # Isolate the failing transaction instead of losing the batch
+            self.logger.warning(f"Batch scoring error, retrying transactions individually: {e}")
+            scored = []
+            for transaction in batch:
+                try:
+                    scored.append((transaction, (await self._score([transaction]))[0]))
+                except Exception as e:
+                    self.failed += 1
+                    self.logger.error(f"Failed to score transaction {transaction.get('tx_hash')}: {e}")
+            batch = [transaction for transaction, _ in scored]
+            results = [result for _, result in scored]
+        self.total_score_time += time.perf_counter() - started
+
+        for transaction, result in zip(batch, results):
+            # Output-level detail of aggregated transactions is only worth keeping when flagged
+            outputs = transaction.get('outputs')
+            if outputs and result['is_fraud']:
+                result = {**result, 'outputs': outputs}
+            self.prediction_index.record(transaction['tx_hash'], result)
+            self.fraud_detected += result['is_fraud']
+
+        if self.prediction_stats is not None:
+            self.prediction_stats.record_many(results)
+
+        self.scored += len(batch)
+        self.batches += 1
+
+    def get_metrics(self) -> Dict:
+        """Get monitor scoring statistics"""
+        return {
+            'scored': self.scored,
+            'fraud_detected': self.fraud_detected,
+            'batches': self.batches,
+            'throttled': self.throttled,
+            'failed': self.failed,
+            'avg_batch_size': self.scored / self.batches if self.batches else 0,
+            'avg_batch_time_ms': self.total_score_time / self.batches * 1000 if self.batches else 0
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from write_behind_cache import WriteBehindCache
+
+PREDICTION_KEY = "prediction:{}"
+RECENT_KEY = "predictions:recent"   # tx_hash scored by prediction time
+ALERTS_KEY = "alerts:by_confidence"  # fraud tx_hash scored by confidence
+
+
+class PredictionIndex:
+    """
+    Cached predictions plus the sorted sets that index them.
+
+    Every prediction is written as `prediction:{tx_hash}` and added to a
+    time-ordered set of recent predictions; fraud verdicts above
+    `alert_threshold` also go into a confidence-ordered alert set. Readers
+    use a bounded ZREVRANGEBYSCORE plus one MGET, so their cost no longer
+    depends on how many keys exist. The time-ordered set finds members whose
+    prediction key has expired, which are pruned from both sets in the
+    background.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        cache: WriteBehindCache,
+        ttl: int = 3600,
+        alert_threshold: float = 0.7,
+        prune_interval: float = 60.0,
+        prune_batch: int = 1000
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.redis_client = redis_client
+        self.cache = cache
+        self.ttl = ttl
+        self.alert_threshold = alert_threshold
+        self.prune_interval = prune_interval
+        self.prune_batch = prune_batch
+        self._pruner = None
+
+    def _commands(self, tx_hash: str, result: Dict, now: float) -> List[Tuple]:
+        commands = [
+            ('setex', PREDICTION_KEY.format(tx_hash), self.ttl, json.dumps(result)),
+            ('zadd', RECENT_KEY, {tx_hash: now})
+        ]
+        if result.get('is_fraud') and result.get('confidence', 0) > self.alert_threshold:
+            commands.append(('zadd', ALERTS_KEY, {tx_hash: result['confidence']}))
+        else:
+            # A re-scored transaction may no longer be an alert
+            commands.append(('zrem', ALERTS_KEY, tx_hash))
+        return commands
+
+    def record(self, tx_hash: str, result: Dict):
+        """Queue a prediction and its index entries on the write-behind cache"""
+        commands = self._commands(tx_hash, result, time.time())
+        # Index entries are dropped with their prediction if the buffer overflows
+        group = self.cache.setex(*commands[0][1:])
+        for command in commands[1:]:
+            self.cache.command(*command, group=group)
+
+    async def record_many(self, predictions: Iterable[Tuple[str, Dict]]):
+        """Write predictions and their index entries in one pipeline call"""
+        now = time.time()
+        commands = []
+        for tx_hash, result in predictions:
+            commands.extend(self._commands(tx_hash, result, now))
+        await self.cache.execute_many(commands)
+
+    async def alerts(self, limit: int = 50, high_risk_threshold: float = 0.9) -> Dict:
+        """Top alerts by confidence plus counts over the whole alert set"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zrevrangebyscore(ALERTS_KEY, '+inf', f'({self.alert_threshold}', start=0, num=limit)
+        pipe.zcount(ALERTS_KEY, f'({self.alert_threshold}', '+inf')
+        pipe.zcount(ALERTS_KEY, f'({high_risk_threshold}', '+inf')
+        tx_hashes, total, high_risk = await pipe.execute()
+
+        alerts = [
+            {
+                "tx_hash": tx_hash,
+                "confidence": prediction['confidence'],
+                "risk_score": prediction['risk_score'],
+                "timestamp": prediction['timestamp']
+            }
+            for tx_hash, prediction in await self._fetch(tx_hashes)
+        ]
+        return {
+            "total_alerts": total,
+            "high_risk_alerts": high_risk,
+            "alerts": alerts
+        }
+
+    async def _fetch(self, tx_hashes: List[str]) -> List[Tuple[str, Dict]]:
+        if not tx_hashes:
+            return []
+        values = await self.redis_client.mget([PREDICTION_KEY.format(h) for h in tx_hashes])
+        return [(h, json.loads(v)) for h, v in zip(tx_hashes, values) if v]
+
+    async def start(self):
+        """Start the background pruning of expired index members"""
+        if self._pruner is None:
+            self._pruner = asyncio.create_task(self._prune_loop())
+
+    async def stop(self):
+        """Stop background pruning"""
+        if self._pruner is None:
+            return
+
+        self._pruner.cancel()
+        try:
+            await self._pruner
+        except asyncio.CancelledError:
+            pass
+        self._pruner = None
+
+    async def _prune_loop(self):
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            try:
+                removed = await self.prune()
+                if removed:
+                    self.logger.debug(f"Pruned {removed} expired predictions from indexes")
+            except Exception as e:
+                self.logger.error(f"Prediction index prune error: {e}")
+
+    async def prune(self) -> int:
+        """Drop index members whose cached prediction has expired"""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        while True:
+            expired = await self.redis_client.zrangebyscore(
+                RECENT_KEY, '-inf', cutoff, start=0, num=self.prune_batch
+            )
+            if not expired:
+                return removed
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zrem(RECENT_KEY, *expired)
+            pipe.zrem(ALERTS_KEY, *expired)
+            await pipe.execute()
+            removed += len(expired)
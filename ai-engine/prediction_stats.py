@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from write_behind_cache import WriteBehindCache
+
+TOTALS_KEY = "prediction_stats:totals"
+MINUTE_KEY = "prediction_stats:minute:{}"
+
+
+def _decode(stored: Dict) -> Dict:
+    # HGETALL returns bytes keys unless the client decodes responses
+    return {k.decode() if isinstance(k, bytes) else k: v for k, v in stored.items()}
+
+
+class PredictionStats:
+    """
+    Rolling prediction counters updated as results are scored.
+
+    Keeps all-time totals (predictions, fraud verdicts, confidence sum) and
+    the same three counters per minute in a ring of `history_minutes`
+    buckets, so reporting overall and windowed rates costs the same no
+    matter how much traffic there has been. Counts accumulated since the
+    last flush are periodically added to Redis hashes with HINCRBY, which
+    lets several API processes contribute to the same totals. On start the
+    totals are seeded from Redis, and `fetch_stats` reports totals and
+    windows across every process from those hashes.
+    """
+
+    WINDOWS = {'1m': 1, '5m': 5, '1h': 60}
+
+    def __init__(
+        self,
+        cache: Optional[WriteBehindCache] = None,
+        history_minutes: int = 60,
+        flush_interval: float = 10.0
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.cache = cache
+        self.history_minutes = history_minutes
+        self.flush_interval = flush_interval
+
+        self.total = 0
+        self.fraud = 0
+        self.confidence_sum = 0.0
+
+        self.minutes = np.full(history_minutes, -1, dtype=np.int64)  # absolute minute held by each bucket
+        self.counts = np.zeros(history_minutes, dtype=np.int64)
+        self.fraud_counts = np.zeros(history_minutes, dtype=np.int64)
+        self.confidence_sums = np.zeros(history_minutes, dtype=np.float64)
+
+        # minute -> [predictions, fraud, confidence_sum] not yet flushed
+        self._unflushed: Dict[int, list] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def record(self, result: Dict, timestamp: Optional[float] = None):
+        """Count one prediction result"""
+        minute = int((timestamp or time.time()) // 60)
+        is_fraud = bool(result.get('is_fraud'))
+        confidence = float(result.get('confidence', 0))
+
+        self.total += 1
+        self.fraud += is_fraud
+        self.confidence_sum += confidence
+
+        pending = self._unflushed.setdefault(minute, [0, 0, 0.0])
+        pending[0] += 1
+        pending[1] += is_fraud
+        pending[2] += confidence
+
+        index = minute % self.history_minutes
+        if self.minutes[index] > minute:
+            return  # older than the retained history
+        if self.minutes[index] != minute:
+            self.minutes[index] = minute
+            self.counts[index] = 0
+            self.fraud_counts[index] = 0
+            self.confidence_sums[index] = 0.0
+        self.counts[index] += 1
+        self.fraud_counts[index] += is_fraud
+        self.confidence_sums[index] += confidence
+
+    def record_many(self, results: Iterable[Dict]):
+        """Count a batch of prediction results"""
+        now = time.time()
+        for result in results:
+            self.record(result, now)
+
+    @staticmethod
+    def _summary(count: int, fraud: int, confidence_sum: float) -> Dict:
+        return {
+            'predictions': count,
+            'fraud_detected': fraud,
+            'fraud_rate': fraud / count if count else 0,
+            'avg_confidence': confidence_sum / count if count else 0
+        }
+
+    @staticmethod
+    def _window_seconds(minutes: int, now: float) -> float:
+        # The current bucket is still filling: count only its elapsed seconds
+        return (minutes - 1) * 60 + max(now % 60, 1.0)
+
+    def window(self, minutes: int, now: Optional[float] = None) -> Dict:
+        """Counters over the last `minutes` minute buckets, including the current one"""
+        now = now or time.time()
+        current = int(now // 60)
+        mask = (self.minutes > current - minutes) & (self.minutes <= current)
+
+        count = int(self.counts[mask].sum())
+        return {
+            **self._summary(count, int(self.fraud_counts[mask].sum()), float(self.confidence_sums[mask].sum())),
+            'predictions_per_second': count / self._window_seconds(minutes, now)
+        }
+
+    def get_stats(self) -> Dict:
+        """All-time totals and windowed rates"""
+        now = time.time()
+        totals = self._summary(self.total, self.fraud, self.confidence_sum)
+        return {
+            'total_predictions': totals['predictions'],
+            'fraud_detected': totals['fraud_detected'],
+            'fraud_rate': totals['fraud_rate'],
+            'avg_confidence': totals['avg_confidence'],
+            'windows': {name: self.window(minutes, now) for name, minutes in self.WINDOWS.items()}
+        }
+
+    def _with_unflushed(self, stored: Dict, minutes) -> list:
+        # Redis hash counters plus what this process has not flushed yet
+        counters = [
+            int(float(stored.get('predictions', 0))),
+            int(float(stored.get('fraud', 0))),
+            float(stored.get('confidence_sum', 0))
+        ]
+        for minute in minutes:
+            pending = self._unflushed.get(minute)
+            if pending:
+                counters = [counters[0] + pending[0], counters[1] + pending[1], counters[2] + pending[2]]
+        return counters
+
+    async def fetch_stats(self) -> Dict:
+        """
+        All-time totals and windowed rates across every process, read from
+        the Redis hashes. Falls back to this process's counters without Redis.
+        """
+        if self.cache is None:
+            return self.get_stats()
+
+        now = time.time()
+        current = int(now // 60)
+        span = max(self.WINDOWS.values())
+        minutes = range(current - span + 1, current + 1)
+
+        pipe = self.cache.redis_client.pipeline(transaction=False)
+        pipe.hgetall(TOTALS_KEY)
+        for minute in minutes:
+            pipe.hgetall(MINUTE_KEY.format(minute))
+        try:
+            stored_totals, *stored_minutes = await pipe.execute()
+        except Exception as e:
+            self.logger.warning(f"Failed to read prediction stats from Redis: {e}")
+            return self.get_stats()
+
+        per_minute = [
+            self._with_unflushed(_decode(stored), (minute,))
+            for minute, stored in zip(minutes, stored_minutes)
+        ]
+        totals = self._summary(*self._with_unflushed(_decode(stored_totals), self._unflushed))
+
+        windows = {}
+        for name, window_minutes in self.WINDOWS.items():
+            counters = per_minute[-window_minutes:]
+            count = sum(c[0] for c in counters)
+            windows[name] = {
+                **self._summary(count, sum(c[1] for c in counters), sum(c[2] for c in counters)),
+                'predictions_per_second': count / self._window_seconds(window_minutes, now)
+            }
+
+        return {
+            'total_predictions': totals['predictions'],
+            'fraud_detected': totals['fraud_detected'],
+            'fraud_rate': totals['fraud_rate'],
+            'avg_confidence': totals['avg_confidence'],
+            'windows': windows
+        }
+
+    async def start(self):
+        """Seed the totals from Redis and start periodically flushing to it"""
+        if self.cache is None or self._flusher is not None:
+            return
+
+        try:
+            stored = _decode(await self.cache.redis_client.hgetall(TOTALS_KEY))
+        except Exception as e:
+            self.logger.warning(f"Failed to seed prediction totals from Redis: {e}")
+        else:
+            self.total, self.fraud, self.confidence_sum = self._with_unflushed(stored, self._unflushed)
+        self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush after a final one"""
+        if self._flusher is None:
+            return
+
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+        self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Queue HINCRBYs for everything counted since the last flush"""
+        if self.cache is None or not self._unflushed:
+            return
+
+        unflushed, self._unflushed = self._unflushed, {}
+        total = fraud = 0
+        confidence_sum = 0.0
+        for minute, (count, minute_fraud, minute_confidence) in unflushed.items():
+            key = MINUTE_KEY.format(minute)
+            self.cache.command('hincrby', key, 'predictions', count)
+            self.cache.command('hincrby', key, 'fraud', minute_fraud)
+            self.cache.command('hincrbyfloat', key, 'confidence_sum', minute_confidence)
+            self.cache.command('expire', key, self.history_minutes * 60 * 2)
+            total += count
+            fraud += minute_fraud
+            confidence_sum += minute_confidence
+
+        self.cache.command('hincrby', TOTALS_KEY, 'predictions', total)
+        self.cache.command('hincrby', TOTALS_KEY, 'fraud', fraud)
+        self.cache.command('hincrbyfloat', TOTALS_KEY, 'confidence_sum', confidence_sum)
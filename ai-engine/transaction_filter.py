@@ -0,0 +1,204 @@
+import math
+import os
+import time
+from decimal import Decimal
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+# Smallest-unit exponent per network: Hathor values are in cents, Ethereum in wei
+NETWORK_DECIMALS = {
+    'hathor': 2,
+    'ethereum': 18
+}
+
+
+class _Rules(NamedTuple):
+    min_value: Dict[str, int]
+    max_value: Dict[str, Optional[int]]
+    exclude_addresses: FrozenSet[str]
+    transaction_types: FrozenSet[str]
+    source_mtime: Optional[float]
+
+
+def _native(amount, decimals: int, rounding) -> int:
+    # Decimal keeps e.g. 0.1 ETH exact when scaled to wei
+    return int(rounding(Decimal(str(amount)).scaleb(decimals)))
+
+
+def _normalize_address(address: str) -> str:
+    # RPC nodes return lowercase hex addresses; Hathor base58 is case-sensitive
+    address = address.strip()
+    return address.lower() if address.startswith('0x') else address
+
+
+def ethereum_tx_type(tx: Dict) -> str:
+    """Plain value transfer, or a call carrying contract input data"""
+    return 'transfer' if tx.get('input') in (None, '', '0x') else 'contract_call'
+
+
+class TransactionFilter:
+    """
+    Compiled form of the monitor's `filters` config.
+
+    Amount bounds (given in whole coins) are converted once to each
+    network's smallest unit, so raw output values and hex wei values are
+    compared as integers without rescaling. Excluded addresses (the config
+    list plus, optionally, one address per line of `exclude_addresses_file`)
+    and transaction types become frozensets. `reload` compiles a new rule
+    set and swaps it in with a single assignment, so checks running
+    concurrently always see one consistent version; `reload_if_changed`
+    does so when the address file was modified.
+    """
+
+    def __init__(self, filters: Dict, decimals: Dict[str, int] = None):
+        self.decimals = decimals or NETWORK_DECIMALS
+        self.filters = filters
+
+        # Metrics
+        self.checked = 0
+        self.passed = 0
+        self.reloads = 0
+        self.loaded_at = None
+
+        self._rules = self._compile(filters)
+
+    def reload(self, filters: Optional[Dict] = None):
+        """Recompile from `filters` (default: the current config and file)"""
+        if filters is not None:
+            self.filters = filters
+        self._rules = self._compile(self.filters)
+        self.reloads += 1
+
+    def reload_if_changed(self) -> bool:
+        """Recompile if the exclude-address file changed since the last load"""
+        path = self.filters.get('exclude_addresses_file')
+        if not path:
+            return False
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return False
+        if mtime == self._rules.source_mtime:
+            return False
+        self.reload()
+        return True
+
+    def _compile(self, filters: Dict) -> _Rules:
+        addresses = set(filters.get('exclude_addresses') or [])
+        source_mtime = None
+        path = filters.get('exclude_addresses_file')
+        if path and os.path.exists(path):
+            source_mtime = os.path.getmtime(path)
+            with open(path) as f:
+                addresses.update(
+                    line for line in map(str.strip, f) if line and not line.startswith('#')
+                )
+
+        min_amount = filters.get('min_amount') or 0
+        max_amount = filters.get('max_amount')
+        self.loaded_at = time.time()
+        return _Rules(
+            min_value={
+                network: _native(min_amount, decimals, math.ceil)
+                for network, decimals in self.decimals.items()
+            },
+            max_value={
+                network: _native(max_amount, decimals, math.floor) if max_amount else None
+                for network, decimals in self.decimals.items()
+            },
+            exclude_addresses=frozenset(_normalize_address(address) for address in addresses),
+            transaction_types=frozenset(filters.get('transaction_types') or ()),
+            source_mtime=source_mtime
+        )
+
+    def allows(self, network: str, value: int, sender: Optional[str], receiver: Optional[str],
+               tx_type: str = 'transfer') -> bool:
+        """Check one transfer; `value` is in the network's smallest unit"""
+        rules = self._rules
+        self.checked += 1
+
+        max_value = rules.max_value[network]
+        if value < rules.min_value[network] or (max_value is not None and value > max_value):
+            return False
+        if rules.transaction_types and tx_type not in rules.transaction_types:
+            return False
+        if sender in rules.exclude_addresses or receiver in rules.exclude_addresses:
+            return False
+
+        self.passed += 1
+        return True
+
+    def filter_outputs(self, network: str, sender: Optional[str],
+                       outputs: List[Dict]) -> List[Tuple[int, Dict]]:
+        """(index, output) pairs of a UTXO transaction's outputs that pass"""
+        rules = self._rules
+        self.checked += len(outputs)
+
+        if (rules.transaction_types and 'transfer' not in rules.transaction_types) \
+                or sender in rules.exclude_addresses:
+            return []
+
+        min_value = rules.min_value[network]
+        max_value = rules.max_value[network]
+        exclude = rules.exclude_addresses
+        kept = [
+            (index, output)
+            for index, output in enumerate(outputs)
+            if output.get('value', 0) >= min_value
+            and (max_value is None or output.get('value', 0) <= max_value)
+            and output.get('script') not in exclude
+        ]
+        self.passed += len(kept)
+        return kept
+
+    def filter_block(self, transactions: List[Dict]) -> List[Tuple[Dict, int, str]]:
+        """
+        (tx, value in wei, tx type) for the transactions of an Ethereum block
+        that pass. Each hex value is parsed once, and the exclude set is
+        intersected with the block's addresses as a whole, so the common
+        block touching no excluded address skips per-transaction lookups.
+        """
+        rules = self._rules
+        self.checked += len(transactions)
+
+        min_value = rules.min_value['ethereum']
+        max_value = rules.max_value['ethereum']
+        values = [int(tx.get('value') or '0x0', 16) for tx in transactions]
+        tx_types = [ethereum_tx_type(tx) for tx in transactions]
+
+        kept = [
+            (tx, value, tx_type)
+            for tx, value, tx_type in zip(transactions, values, tx_types)
+            if value >= min_value
+            and (max_value is None or value <= max_value)
+            and (not rules.transaction_types or tx_type in rules.transaction_types)
+        ]
+
+        if kept and rules.exclude_addresses:
+            excluded = rules.exclude_addresses.intersection(self._addresses(tx for tx, _, _ in kept))
+            if excluded:
+                kept = [
+                    item for item in kept
+                    if item[0].get('from') not in excluded and item[0].get('to') not in excluded
+                ]
+
+        self.passed += len(kept)
+        return kept
+
+    @staticmethod
+    def _addresses(transactions: Iterable[Dict]) -> Iterable[str]:
+        for tx in transactions:
+            yield tx.get('from')
+            yield tx.get('to')
+
+    def get_stats(self) -> Dict:
+        """Get filter size and pass-rate statistics"""
+        rules = self._rules
+        return {
+            'checked': self.checked,
+            'passed': self.passed,
+            'pass_rate': self.passed / self.checked if self.checked else 0,
+            'exclude_addresses': len(rules.exclude_addresses),
+            'transaction_types': sorted(rules.transaction_types),
+            'reloads': self.reloads,
+            'loaded_at': self.loaded_at
+        }
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+
+class WriteBehindCache:
+    """
+    Buffers Redis writes and flushes them through one pipeline.
+
+    SETEX writes are queued in memory (a later write to the same key
+    replaces the pending one) together with any other write commands queued
+    through `command`, and sent when `max_batch` are pending or every
+    `flush_interval_ms`, so a burst of predictions costs one round trip
+    instead of one per key. If Redis is unavailable the buffer is capped at
+    `max_pending` and writes are dropped oldest first, in the order they
+    were queued across SETEXs and commands, and counted. A command queued
+    with `group=` (the number `setex` returns) is dropped together with
+    that SETEX, so e.g. a prediction never survives without its index
+    entries or the other way round.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        max_batch: int = 500,
+        flush_interval_ms: float = 5.0,
+        max_pending: int = 50000
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.redis_client = redis_client
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+
+        # Entries carry the sequence number they were queued with, which
+        # orders eviction across both buffers
+        self._pending: Dict[str, Tuple[int, int, str]] = {}
+        # Other commands keep their order and are sent after the SETEXs
+        self._commands: Deque[Tuple[int, Tuple]] = deque()
+        self._seq = 0
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.writes = 0
+        self.flushed_writes = 0
+        self.dropped_writes = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.total_flush_time = 0.0
+        self.max_flush_time = 0.0
+
+    async def start(self):
+        """Start the periodic flusher on the running event loop"""
+        if self._flusher is not None:
+            return
+
+        self._flush_requested = asyncio.Event()
+        self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher after writing out everything still buffered"""
+        if self._flusher is None:
+            return
+
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+
+        await self.flush()
+
+    def setex(self, key: str, ttl: int, value: str) -> int:
+        """Queue a SETEX; returns immediately with its sequence number"""
+        self._seq += 1
+        self._pending.pop(key, None)
+        self._pending[key] = (self._seq, ttl, value)
+        self._queued()
+        return self._seq
+
+    def command(self, name: str, *args, group: Optional[int] = None):
+        """
+        Queue any pipeline write command, e.g. command('zadd', key, mapping).
+
+        With `group` set to what `setex` returned, overflow drops the
+        command and that SETEX together.
+        """
+        if group is None:
+            self._seq += 1
+            group = self._seq
+        self._commands.append((group, (name, *args)))
+        self._queued()
+
+    def _queued(self):
+        self.writes += 1
+
+        while len(self._pending) + len(self._commands) > self.max_pending:
+            # Drop the oldest entry, with everything queued in its group
+            oldest_pending = next(iter(self._pending.values()))[0] if self._pending else None
+            oldest_command = self._commands[0][0] if self._commands else None
+            oldest = min(seq for seq in (oldest_pending, oldest_command) if seq is not None)
+            if oldest_pending == oldest:
+                del self._pending[next(iter(self._pending))]
+                self.dropped_writes += 1
+            while self._commands and self._commands[0][0] == oldest:
+                self._commands.popleft()
+                self.dropped_writes += 1
+
+        if len(self._pending) + len(self._commands) >= self.max_batch and self._flush_requested is not None:
+            self._flush_requested.set()
+
+    async def setex_many(self, items: Iterable[Tuple[str, int, str]]):
+        """Write several keys now in a single pipeline call"""
+        await self.execute_many(('setex', *item) for item in items)
+
+    async def execute_many(self, commands: Iterable[Tuple]):
+        """Send `(name, *args)` write commands now in a single pipeline call"""
+        commands = list(commands)
+        self.writes += len(commands)
+        await self._write(commands)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Send all buffered writes"""
+        while self._pending or self._commands:
+            keys = list(islice(self._pending, self.max_batch))
+            items = [('setex', key, *self._pending.pop(key)[1:]) for key in keys]
+            while self._commands and len(items) < self.max_batch:
+                items.append(self._commands.popleft()[1])
+            await self._write(items)
+
+    async def _write(self, items):
+        if not items:
+            return
+
+        started = time.perf_counter()
+        try:
+            await self._execute(items)
+        except Exception as e:
+            self.failed_flushes += 1
+            self.dropped_writes += len(items)
+            self.logger.error(f"Cache flush failed, dropped {len(items)} writes: {e}")
+            return
+        finally:
+            elapsed = time.perf_counter() - started
+            self.total_flush_time += elapsed
+            self.max_flush_time = max(self.max_flush_time, elapsed)
+            self.flushes += 1
+
+        self.flushed_writes += len(items)
+
+    async def _execute(self, items):
+        pipe = self.redis_client.pipeline(transaction=False)
+        for name, *args in items:
+            getattr(pipe, name)(*args)
+        await pipe.execute()
+
+    def get_metrics(self) -> Dict:
+        """Get write-behind statistics"""
+        return {
+            'pending_writes': len(self._pending) + len(self._commands),
+            'writes': self.writes,
+            'flushed_writes': self.flushed_writes,
+            'dropped_writes': self.dropped_writes,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'avg_flush_latency_ms': self.total_flush_time / self.flushes * 1000 if self.flushes else 0,
+            'max_flush_latency_ms': self.max_flush_time * 1000
+        }
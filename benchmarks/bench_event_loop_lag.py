@@ -0,0 +1,109 @@
+"""
+Measure event-loop lag while caching transactions in Redis at a fixed rate.
+
+Compares the same write pattern, one SETEX per transaction, issued with
+the synchronous redis.Redis client from a coroutine and with the
+redis.asyncio client as a task per write, so the only difference is the
+client. A probe task sleeps for `--probe-ms` in a loop and records how late it
+wakes up; any time spent blocked in a Redis round trip shows up there.
+Needs a reachable Redis server; writes go to `bench:` keys with a short TTL.
+
+Usage:
+    python benchmarks/bench_event_loop_lag.py [--rate 1000] [--duration 10] [--redis-url redis://localhost:6379]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import redis
+import redis.asyncio as aioredis
+
+
+PAYLOAD = json.dumps({
+    'tx_hash': '0' * 64,
+    'sender': 'H' + 'a' * 33,
+    'receiver': 'H' + 'b' * 33,
+    'amount': 125.0,
+    'timestamp': 0.0,
+    'network': 'hathor'
+})
+
+
+async def probe(interval: float, lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def produce(rate: int, duration: float, write):
+    """Call `write(i)` so that `rate` calls per second are issued on average"""
+    started = time.perf_counter()
+    sent = 0
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= duration:
+            return sent
+        due = int(elapsed * rate)
+        while sent < due:
+            write(sent)
+            sent += 1
+        await asyncio.sleep(0.001)
+
+
+async def run(mode: str, args) -> dict:
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(args.probe_ms / 1000, lags, stop))
+
+    if mode == 'sync':
+        client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+        write = lambda i: client.setex(f"bench:{i}", 60, PAYLOAD)
+        sent = await produce(args.rate, args.duration, write)
+        client.close()
+    else:
+        pool = aioredis.BlockingConnectionPool.from_url(args.redis_url, max_connections=10, decode_responses=True)
+        client = aioredis.Redis(connection_pool=pool)
+        pending = set()
+
+        def write(i):
+            task = asyncio.create_task(client.setex(f"bench:{i}", 60, PAYLOAD))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        sent = await produce(args.rate, args.duration, write)
+        await asyncio.gather(*pending)
+        await client.close()
+        await pool.disconnect()
+
+    stop.set()
+    await probe_task
+
+    lags_ms = np.array(lags) * 1000
+    return {
+        'sent': sent,
+        'rate': sent / args.duration,
+        'p50': np.percentile(lags_ms, 50),
+        'p99': np.percentile(lags_ms, 99),
+        'max': lags_ms.max()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rate', type=int, default=1000, help='transactions per second')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per mode')
+    parser.add_argument('--probe-ms', type=float, default=1.0)
+    parser.add_argument('--redis-url', default='redis://localhost:6379')
+    args = parser.parse_args()
+
+    print(f"{'client':<8} {'tx/s':>8} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for mode in ('sync', 'asyncio'):
+        result = asyncio.run(run(mode, args))
+        print(f"{mode:<8} {result['rate']:>8.0f} {result['p50']:>11.3f} {result['p99']:>11.3f} {result['max']:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
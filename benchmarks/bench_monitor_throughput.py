@@ -0,0 +1,160 @@
+"""
+Check that monitor scoring keeps up with a replayed Hathor stream.
+
+Feeds synthetic `new_transaction` payloads into
+BlockchainMonitor._process_hathor_transaction at `--target-tps` (0 means as
+fast as possible) and lets the built-in consumer path (ingestion queue ->
+MonitorScorer -> InferencePool -> write-behind cache) score them. Reports
+ingest and scoring throughput, the peak ingestion queue depth and the lag
+from transaction timestamp to score. With `--recording` a StreamRecorder
+file is replayed instead, at `--speed` times the recorded rate (0 means as
+fast as possible). Needs a trained model and a reachable Redis server.
+
+Usage:
+    python benchmarks/bench_monitor_throughput.py [--transactions 20000] [--target-tps 1000] [--model-path ./ai-engine/models/fraud_model]
+    python benchmarks/bench_monitor_throughput.py --recording ./recordings/monitor.jsonl.gz [--speed 0]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import redis.asyncio as aioredis
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'ai-engine')]
+
+from address_risk import AddressRiskEngine
+from blockchain_monitor import BlockchainMonitor
+from feature_store import VelocityFeatureStore
+from fraud_detector import FraudDetector
+from inference_pool import InferencePool
+from ingestion_queue import IngestionQueue
+from monitor_scorer import MonitorScorer
+from prediction_index import PredictionIndex
+from prediction_stats import PredictionStats
+from stream_recorder import StreamReplay
+from write_behind_cache import WriteBehindCache
+
+
+def hathor_stream(count: int, n_addresses: int, seed: int = 42):
+    """Synthetic Hathor transactions with one or two outputs each"""
+    rng = np.random.RandomState(seed)
+    addresses = [f"H{i:033d}" for i in range(n_addresses)]
+    for i in range(count):
+        outputs = [
+            {'value': int(rng.exponential(10000)), 'script': addresses[rng.randint(n_addresses)]}
+            for _ in range(rng.randint(1, 3))
+        ]
+        yield {
+            'hash': f"{i:064x}",
+            'height': i,
+            'inputs': [{'address': addresses[rng.randint(n_addresses)]}],
+            'outputs': outputs
+        }
+
+
+async def run(args) -> dict:
+    velocity_store = VelocityFeatureStore()
+    address_risk = AddressRiskEngine()
+    detector = FraudDetector(args.model_path, feature_store=velocity_store, risk_engine=address_risk)
+    pool = InferencePool(detector, max_workers=args.workers, max_pending=args.workers * 4)
+
+    redis_client = aioredis.Redis(connection_pool=aioredis.BlockingConnectionPool.from_url(
+        args.redis_url, max_connections=10, decode_responses=True
+    ))
+    cache = WriteBehindCache(redis_client)
+    index = PredictionIndex(redis_client, cache)
+    stats = PredictionStats(cache)
+    monitor = BlockchainMonitor(
+        feature_store=velocity_store, risk_engine=address_risk, cache=cache, redis_client=redis_client
+    )
+    monitor.ingestion_queue = IngestionQueue(
+        monitor._dispatch, consumers=args.consumers, batch_size=args.batch_size
+    )
+    scorer = MonitorScorer(pool.predict_batch, index, stats)
+    monitor.add_batch_callback(scorer)
+
+    await cache.start()
+    await monitor.ingestion_queue.start()
+
+    max_depth = 0
+    sent = 0
+    started = time.perf_counter()
+    if args.recording:
+        replay = StreamReplay(args.recording, speed=args.speed)
+        replaying = asyncio.create_task(replay.run(monitor))
+        while not replaying.done():
+            max_depth = max(max_depth, monitor.ingestion_queue.queue_depth)
+            await asyncio.sleep(0.01)
+        await replaying
+        sent = replay.transactions
+    else:
+        for tx in hathor_stream(args.transactions, args.addresses):
+            if args.target_tps:
+                delay = started + sent / args.target_tps - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tx['timestamp'] = time.time()
+            await monitor._process_hathor_transaction(tx)
+            sent += 1
+            max_depth = max(max_depth, monitor.ingestion_queue.queue_depth)
+    ingest_time = time.perf_counter() - started
+
+    queue = monitor.ingestion_queue
+    await queue.join()
+    total_time = time.perf_counter() - started
+
+    metrics = queue.get_metrics()
+    await queue.stop()
+    await cache.stop()
+    pool.shutdown()
+    await redis_client.close()
+
+    result = {
+        'transactions': sent,
+        'records': queue.enqueued,
+        'ingest_tps': sent / ingest_time,
+        'scored_rps': scorer.scored / total_time,
+        'max_queue_depth': max_depth,
+        'drain_seconds': total_time - ingest_time,
+        'lag_p50_ms': metrics['lag_p50_ms'],
+        'lag_p99_ms': metrics['lag_p99_ms'],
+        'avg_batch_size': metrics['avg_batch_size']
+    }
+    if args.recording:
+        # Lag is measured from the recorded transaction timestamps
+        del result['lag_p50_ms'], result['lag_p99_ms']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--target-tps', type=float, default=1000, help='replay rate; 0 for as fast as possible')
+    parser.add_argument('--addresses', type=int, default=5000)
+    parser.add_argument('--recording', help='StreamRecorder file to replay instead of the synthetic stream')
+    parser.add_argument('--speed', type=float, default=0, help='replay speed multiple; 0 for as fast as possible')
+    parser.add_argument('--consumers', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--model-path', default=os.path.join(ROOT, 'ai-engine', 'models', 'fraud_model'))
+    parser.add_argument('--redis-url', default='redis://localhost:6379')
+    args = parser.parse_args()
+
+    if not os.path.exists(f"{args.model_path}_ml.pkl"):
+        sys.exit(f"No model at {args.model_path}; train one first")
+
+    result = asyncio.run(run(args))
+    for key, value in result.items():
+        print(f"{key:<18} {value:>12.1f}" if isinstance(value, float) else f"{key:<18} {value:>12}")
+
+    if args.target_tps and not args.recording:
+        kept_up = result['drain_seconds'] < 1.0
+        print(f"kept up with {args.target_tps:.0f} tx/s: {'yes' if kept_up else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the NumPy forward pass against Keras `Model.predict`.
+
+Builds and briefly fits the network FraudDetector uses on synthetic
+transactions, exports it with `NumpyNetwork.from_keras`, checks that both
+produce the same probabilities (within float32 tolerance) and reports
+per-batch latency for a range of batch sizes. Skipped when TensorFlow is
+not installed.
+
+Usage:
+    python benchmarks/bench_nn_inference.py [--samples 1000] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fraud_detector import FraudDetector
+from nn_inference import NumpyNetwork
+
+
+def _time_call(fn, X, repeat: int) -> float:
+    fn(X)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--samples', type=int, default=1000, help='training samples')
+    parser.add_argument('--epochs', type=int, default=3, help='training epochs')
+    parser.add_argument('--repeat', type=int, default=20, help='timed calls per batch size')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    try:
+        import tensorflow  # noqa: F401
+    except ImportError:
+        print("TensorFlow is not installed; skipping the Keras parity check")
+        return
+
+    rng = np.random.RandomState(42)
+    X_train = rng.randn(args.samples, 10).astype(np.float32)
+    y_train = rng.choice([0, 1], args.samples, p=[0.9, 0.1])
+
+    model = FraudDetector().build_neural_network(X_train.shape[1])
+    model.fit(X_train, y_train, epochs=args.epochs, batch_size=32, verbose=0)
+    network = NumpyNetwork.from_keras(model)
+
+    keras_predict = lambda X: model.predict(X, verbose=0)
+
+    print(f"{'batch':>7} {'keras':>10} {'numpy':>10} {'max abs diff':>13}  (ms/batch)")
+    for batch_size in args.batch_sizes:
+        X = rng.randn(batch_size, 10).astype(np.float32)
+
+        expected = keras_predict(X)
+        actual = network.predict(X)
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected, rtol=1e-5, atol=1e-6)
+
+        keras_ms = _time_call(keras_predict, X, args.repeat)
+        numpy_ms = _time_call(network.predict, X, args.repeat)
+        print(f"{batch_size:>7} {keras_ms:>10.3f} {numpy_ms:>10.3f} "
+              f"{float(np.max(np.abs(actual - expected))):>13.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure API cold-start cost broken down by component.
+
+Every step runs in a fresh interpreter so import caches from earlier steps
+do not hide their cost. Reports wall time, the peak resident set size of
+the process after the step, and whether TensorFlow ended up imported.
+
+Usage:
+    python benchmarks/bench_startup.py [--model-path ./ai-engine/models/fraud_model]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Each step: (label, setup code that is not timed, timed code)
+IMPORT_STEPS = [
+    ('import numpy', '', 'import numpy'),
+    ('import pandas', 'import numpy', 'import pandas'),
+    ('import sklearn.ensemble', 'import numpy', 'import sklearn.ensemble'),
+    ('import tensorflow', 'import numpy', 'import tensorflow'),
+    ('import fraud_detector', '', 'import fraud_detector'),
+]
+
+LOAD_STEPS = [
+    ('load pickle (sklearn)', 'import joblib, fraud_detector', 'joblib.load(MODEL + "_ml.pkl")'),
+    ('compile trees',
+     'import joblib, fraud_detector; d = fraud_detector.FraudDetector(); m = joblib.load(MODEL + "_ml.pkl"); '
+     'd.isolation_forest = m["isolation_forest"]; d.random_forest = m["random_forest"]',
+     'd._compile_trees()'),
+    ('load nn (.npz)', 'import nn_inference', 'nn_inference.NumpyNetwork.load(MODEL + "_nn.npz")'),
+    ('load nn (keras .h5)', 'from tensorflow import keras', 'keras.models.load_model(MODEL + "_nn.h5")'),
+    ('load_model (pickle + npz)', 'import fraud_detector', 'fraud_detector.FraudDetector(MODEL)'),
+    ('load_model (mmap)', 'import fraud_detector', 'fraud_detector.FraudDetector(MODEL, mmap_model=True)'),
+]
+
+CHILD = '''
+import json, resource, sys, time
+sys.path[:0] = {paths!r}
+MODEL = {model!r}
+{setup}
+start = time.perf_counter()
+{timed}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'tensorflow_loaded': 'tensorflow' in sys.modules
+}}))
+'''
+
+
+def run_step(setup: str, timed: str, model: str) -> dict:
+    code = CHILD.format(paths=[ROOT, os.path.join(ROOT, 'ai-engine')], model=model, setup=setup, timed=timed)
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()
+        return {'error': error[-1] if error else 'failed'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--model-path', default=os.path.join(ROOT, 'ai-engine', 'models', 'fraud_model'))
+    args = parser.parse_args()
+
+    steps = IMPORT_STEPS
+    if os.path.exists(f"{args.model_path}_ml.pkl"):
+        steps = steps + LOAD_STEPS
+    else:
+        print(f"No model at {args.model_path}; skipping model-load steps")
+
+    print(f"{'step':<28} {'time ms':>10} {'max RSS MB':>11}  tensorflow")
+    for label, setup, timed in steps:
+        result = run_step(setup, timed, args.model_path)
+        if 'error' in result:
+            print(f"{label:<28} {'-':>10} {'-':>11}  ({result['error']})")
+            continue
+        print(f"{label:<28} {result['seconds'] * 1000:>10.1f} {result['max_rss_mb']:>11.1f}  "
+              f"{'yes' if result['tensorflow_loaded'] else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
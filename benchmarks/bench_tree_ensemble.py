@@ -0,0 +1,70 @@
+"""
+Benchmark the compiled flat-array tree ensemble against sklearn scoring.
+
+Fits the same RandomForest/IsolationForest configuration FraudDetector uses
+on synthetic transactions, checks that both backends agree bit for bit and
+reports per-batch latency for a range of batch sizes.
+
+Usage:
+    python benchmarks/bench_tree_ensemble.py [--samples 1000] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+
+from tree_ensemble import CompiledIsolationForest, CompiledRandomForest
+
+
+def _time_call(fn, X, repeat: int) -> float:
+    fn(X)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--samples', type=int, default=1000, help='training samples')
+    parser.add_argument('--repeat', type=int, default=50, help='timed calls per batch size')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(42)
+    X_train = rng.randn(args.samples, 10)
+    y_train = rng.choice([0, 1], args.samples, p=[0.9, 0.1])
+
+    isolation_forest = IsolationForest(contamination=0.1, random_state=42).fit(X_train)
+    random_forest = RandomForestClassifier(n_estimators=100, random_state=42).fit(X_train, y_train)
+
+    start = time.perf_counter()
+    compiled_if = CompiledIsolationForest.from_sklearn(isolation_forest)
+    compiled_rf = CompiledRandomForest.from_sklearn(random_forest)
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"compile time: {compile_ms:.1f} ms "
+          f"({compiled_rf.ensemble.feature.size} RF nodes, {compiled_if.ensemble.feature.size} IF nodes)")
+
+    print(f"{'batch':>7} {'rf sklearn':>11} {'rf compiled':>12} {'if sklearn':>11} {'if compiled':>12}  (ms/batch)")
+    for batch_size in args.batch_sizes:
+        X = rng.randn(batch_size, 10)
+
+        assert np.array_equal(random_forest.predict_proba(X), compiled_rf.predict_proba(X))
+        assert np.array_equal(isolation_forest.score_samples(X), compiled_if.score_samples(X))
+
+        repeat = max(1, args.repeat * 100 // max(batch_size, 100))
+        print(f"{batch_size:>7} "
+              f"{_time_call(random_forest.predict_proba, X, repeat):>11.3f} "
+              f"{_time_call(compiled_rf.predict_proba, X, repeat):>12.3f} "
+              f"{_time_call(isolation_forest.score_samples, X, repeat):>11.3f} "
+              f"{_time_call(compiled_if.score_samples, X, repeat):>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""
+Local stand-in for the Hathor and Ethereum endpoints the monitor talks to.
+
+Serves, on one port:
+  ws   /v1a/ws           Hathor websocket; after a `subscribe` message it
+                         streams `new_transaction` messages at --hathor-tps
+  GET  /v1a/transaction  Hathor REST history, newest first, paged with
+                         page=next&timestamp=..&hash=.. (checkpoint replay)
+  POST /rpc              Ethereum JSON-RPC (single or batch): eth_blockNumber
+                         and eth_getBlockByNumber with full transactions;
+                         a block of ~--eth-tps * --block-time transactions is
+                         mined every --block-time seconds
+
+Traffic is a mix of ordinary transfers (and, on Ethereum, token contract
+calls) with a --fraud-rate share of injected patterns:
+  large_transfer  one transfer ~1000x the usual size
+  fan_out         one sender paying many fresh addresses at once
+  rapid_fire      a burst of transfers from one sender to one receiver
+Transaction timestamps are the wall-clock send time (fractional seconds),
+so the monitor's end-to-end lag is measured against this process's clock.
+With --labels, every injected transaction is written as a JSONL line
+`{"network", "tx_hash", "pattern"}` for checking what was flagged.
+
+Point the monitor at it with config overrides such as:
+  networks.hathor.websocket_url = ws://localhost:8090/v1a/ws
+  networks.hathor.rest_api      = http://localhost:8090/v1a
+  networks.ethereum.rest_api    = http://localhost:8090/rpc
+
+Usage:
+    python benchmarks/synthetic_node.py [--port 8090] [--hathor-tps 200] [--eth-tps 50] [--block-time 12] [--fraud-rate 0.02] [--labels labels.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+FRAUD_PATTERNS = ('large_transfer', 'fan_out', 'rapid_fire')
+
+# ERC-20 transfer(address,uint256) selector
+TOKEN_TRANSFER_INPUT = '0xa9059cbb' + '0' * 128
+
+
+class SyntheticChain:
+    """Transaction generator shared by the Hathor and Ethereum endpoints"""
+
+    def __init__(self, n_addresses: int = 5000, fraud_rate: float = 0.02, seed: int = 42,
+                 labels_path: Optional[str] = None):
+        self.rng = np.random.RandomState(seed)
+        self.fraud_rate = fraud_rate
+        self.hathor_addresses = [f"H{i:033d}" for i in range(n_addresses)]
+        self.eth_addresses = [f"0x{i:040x}" for i in range(1, n_addresses + 1)]
+        self.sequence = 0
+        self.labels = open(labels_path, 'a') if labels_path else None
+
+        # Metrics
+        self.generated = Counter()
+        self.injected = Counter()
+
+    def _next_hash(self) -> str:
+        self.sequence += 1
+        return f"{self.sequence:064x}"
+
+    def _fresh_address(self, network: str) -> str:
+        # Never-seen-before receivers, as fraud payouts typically use
+        self.sequence += 1
+        return f"Hf{self.sequence:032d}" if network == 'hathor' else f"0xf{self.sequence:039x}"
+
+    def _amount(self) -> float:
+        """Ordinary transfer size in whole coins"""
+        return float(self.rng.lognormal(mean=3.0, sigma=1.5))
+
+    def _pick(self, addresses: List[str]) -> str:
+        return addresses[self.rng.randint(len(addresses))]
+
+    def _label(self, network: str, transactions: List[Dict], pattern: str):
+        self.injected[pattern] += len(transactions)
+        if self.labels is not None:
+            for tx in transactions:
+                self.labels.write(json.dumps({'network': network, 'tx_hash': tx['hash'], 'pattern': pattern}) + '\n')
+
+    def _pattern(self) -> Optional[str]:
+        if self.rng.random_sample() < self.fraud_rate:
+            return FRAUD_PATTERNS[self.rng.randint(len(FRAUD_PATTERNS))]
+        return None
+
+    def hathor_transactions(self, height: int) -> List[Dict]:
+        """One ordinary transaction, or the transactions of one fraud pattern"""
+        pattern = self._pattern()
+        sender = self._pick(self.hathor_addresses)
+
+        def tx(outputs):
+            return {
+                'hash': self._next_hash(),
+                'timestamp': time.time(),
+                'height': height,
+                'inputs': [{'address': sender}],
+                # Values are in cents, as on the Hathor node
+                'outputs': [{'value': int(amount * 100), 'script': receiver} for receiver, amount in outputs]
+            }
+
+        if pattern == 'large_transfer':
+            txs = [tx([(self._pick(self.hathor_addresses), self._amount() * 1000)])]
+        elif pattern == 'fan_out':
+            txs = [tx([(self._fresh_address('hathor'), self._amount()) for _ in range(self.rng.randint(10, 31))])]
+        elif pattern == 'rapid_fire':
+            receiver = self._fresh_address('hathor')
+            txs = [tx([(receiver, self._amount())]) for _ in range(self.rng.randint(5, 16))]
+        else:
+            txs = [tx([
+                (self._pick(self.hathor_addresses), self._amount())
+                for _ in range(self.rng.randint(1, 3))
+            ])]
+
+        self.generated['hathor'] += len(txs)
+        if pattern:
+            self._label('hathor', txs, pattern)
+        return txs
+
+    def ethereum_block(self, number: int, n_transactions: int) -> Dict:
+        """A block in eth_getBlockByNumber(..., true) form"""
+        timestamp = int(time.time())
+        transactions = []
+        while len(transactions) < n_transactions:
+            pattern = self._pattern()
+            sender = self._pick(self.eth_addresses)
+
+            def tx(receiver, amount, data='0x'):
+                return {
+                    'hash': f"0x{self._next_hash()}",
+                    'blockNumber': hex(number),
+                    'from': sender,
+                    'to': receiver,
+                    'value': hex(int(amount * 1e18)) if data == '0x' else '0x0',
+                    'gas': hex(21000 if data == '0x' else 65000),
+                    'gasPrice': hex(int(self.rng.uniform(10, 60) * 1e9)),
+                    'input': data
+                }
+
+            if pattern == 'large_transfer':
+                txs = [tx(self._pick(self.eth_addresses), self._amount() / 100 * 1000)]
+            elif pattern == 'fan_out':
+                txs = [tx(self._fresh_address('ethereum'), self._amount() / 100) for _ in range(self.rng.randint(10, 31))]
+            elif pattern == 'rapid_fire':
+                receiver = self._fresh_address('ethereum')
+                txs = [tx(receiver, self._amount() / 100) for _ in range(self.rng.randint(5, 16))]
+            elif self.rng.random_sample() < 0.3:
+                txs = [tx(self._pick(self.eth_addresses), 0, TOKEN_TRANSFER_INPUT)]
+            else:
+                txs = [tx(self._pick(self.eth_addresses), self._amount() / 100)]
+
+            for item in txs:
+                item['transactionIndex'] = hex(len(transactions))
+                transactions.append(item)
+            if pattern:
+                self._label('ethereum', txs, pattern)
+
+        self.generated['ethereum'] += len(transactions)
+        return {
+            'number': hex(number),
+            'hash': f"0x{self._next_hash()}",
+            'timestamp': hex(timestamp),
+            'transactions': transactions
+        }
+
+    def close(self):
+        if self.labels is not None:
+            self.labels.close()
+
+
+class SyntheticNode:
+    def __init__(self, chain: SyntheticChain, hathor_tps: float, eth_tps: float, block_time: float,
+                 history_size: int = 10000, max_blocks: int = 1024, first_block: int = 18000000):
+        self.chain = chain
+        self.hathor_tps = hathor_tps
+        self.eth_tps = eth_tps
+        self.block_time = block_time
+        self.history_size = history_size
+        self.max_blocks = max_blocks
+
+        self.subscribers = set()
+        self.history: List[Dict] = []
+        self.blocks: 'OrderedDict[int, Dict]' = OrderedDict()
+        self.latest_block = first_block
+        self.blocks[first_block] = chain.ethereum_block(first_block, 0)
+        self.sent_messages = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/v1a/ws', self.handle_websocket)
+        app.router.add_get('/v1a/transaction', self.handle_history)
+        app.router.add_post('/rpc', self.handle_rpc)
+        return app
+
+    # Hathor
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(msg.data)
+                except json.JSONDecodeError:
+                    continue
+                if data.get('type') == 'subscribe' and data.get('data') == 'new_transactions':
+                    self.subscribers.add(ws)
+        finally:
+            self.subscribers.discard(ws)
+        return ws
+
+    async def handle_history(self, request: web.Request) -> web.Response:
+        count = int(request.query.get('count', 100))
+        end = len(self.history)
+        if request.query.get('page') == 'next':
+            tx_id = request.query.get('hash')
+            end = next((i for i in range(len(self.history) - 1, -1, -1)
+                        if self.history[i]['hash'] == tx_id), 0)
+        start = max(0, end - count)
+        page = [dict(tx, tx_id=tx['hash']) for tx in reversed(self.history[start:end])]
+        return web.json_response({'success': True, 'transactions': page, 'has_more': start > 0})
+
+    async def hathor_loop(self):
+        """Emit new_transaction messages at hathor_tps, in 10 ms ticks"""
+        started = time.perf_counter()
+        sent = 0
+        height = 0
+        while True:
+            due = int((time.perf_counter() - started) * self.hathor_tps)
+            while sent < due:
+                height += 1
+                for tx in self.chain.hathor_transactions(height):
+                    await self._broadcast(json.dumps({'type': 'new_transaction', 'data': tx}))
+                    self.history.append(tx)
+                    sent += 1
+            if len(self.history) > 2 * self.history_size:
+                del self.history[:-self.history_size]
+            await asyncio.sleep(0.01)
+
+    async def _broadcast(self, message: str):
+        for ws in list(self.subscribers):
+            if ws.closed:
+                self.subscribers.discard(ws)
+                continue
+            try:
+                await ws.send_str(message)
+                self.sent_messages += 1
+            except ConnectionError:
+                self.subscribers.discard(ws)
+
+    # Ethereum
+
+    async def handle_rpc(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([self._rpc_call(call) for call in payload])
+        return web.json_response(self._rpc_call(payload))
+
+    def _rpc_call(self, call: Dict) -> Dict:
+        response = {'jsonrpc': '2.0', 'id': call.get('id')}
+        method = call.get('method')
+        if method == 'eth_blockNumber':
+            response['result'] = hex(self.latest_block)
+        elif method == 'eth_getBlockByNumber':
+            params = call.get('params') or ['latest']
+            number = self.latest_block if params[0] == 'latest' else int(params[0], 16)
+            block = self.blocks.get(number)
+            full_transactions = len(params) > 1 and params[1]
+            if block is not None and not full_transactions:
+                block = dict(block, transactions=[tx['hash'] for tx in block['transactions']])
+            response['result'] = block
+        else:
+            response['error'] = {'code': -32601, 'message': f"Method not found: {method}"}
+        return response
+
+    async def ethereum_loop(self):
+        """Mine a block every block_time seconds"""
+        while True:
+            await asyncio.sleep(self.block_time)
+            n_transactions = int(self.chain.rng.poisson(self.eth_tps * self.block_time))
+            self.latest_block += 1
+            self.blocks[self.latest_block] = self.chain.ethereum_block(self.latest_block, n_transactions)
+            while len(self.blocks) > self.max_blocks:
+                self.blocks.popitem(last=False)
+
+    async def report_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            print(
+                f"hathor sent={self.chain.generated['hathor']} subscribers={len(self.subscribers)} | "
+                f"ethereum block={self.latest_block} txs={self.chain.generated['ethereum']} | "
+                f"injected={dict(self.chain.injected)}",
+                flush=True
+            )
+
+
+async def serve(args):
+    chain = SyntheticChain(args.addresses, args.fraud_rate, args.seed, args.labels)
+    node = SyntheticNode(chain, args.hathor_tps, args.eth_tps, args.block_time)
+
+    runner = web.AppRunner(node.app())
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    print(f"Synthetic node on http://{args.host}:{args.port} (ws /v1a/ws, REST /v1a, JSON-RPC /rpc)", flush=True)
+
+    tasks = [node.report_loop(args.report_interval)]
+    if args.hathor_tps > 0:
+        tasks.append(node.hathor_loop())
+    if args.eth_tps > 0:
+        tasks.append(node.ethereum_loop())
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        chain.close()
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--hathor-tps', type=float, default=200, help='0 disables the Hathor stream')
+    parser.add_argument('--eth-tps', type=float, default=50, help='0 disables block production')
+    parser.add_argument('--block-time', type=float, default=12)
+    parser.add_argument('--fraud-rate', type=float, default=0.02, help='share of events that are fraud patterns')
+    parser.add_argument('--addresses', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--labels', help='JSONL file receiving the injected transactions')
+    parser.add_argument('--report-interval', type=float, default=10)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class _BucketedWindow:
+    """
+    Per-slot ring of fixed-width time buckets holding counts and amount sums.
+
+    A slot's ring covers the last `n_buckets * bucket_seconds` seconds; buckets
+    that fall out of the window are cleared lazily when the slot is next
+    updated, so updates and lookups cost O(n_buckets) regardless of traffic.
+    Lookups only read the buckets inside the requested window.
+    """
+
+    def __init__(self, capacity: int, bucket_seconds: int, n_buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.counts = np.zeros((capacity, n_buckets), dtype=np.int32)
+        self.sums = np.zeros((capacity, n_buckets), dtype=np.float64)
+        self.head = np.zeros(capacity, dtype=np.int64)  # newest absolute bucket number
+
+    def reset(self, slot: int):
+        self.counts[slot] = 0
+        self.sums[slot] = 0.0
+        self.head[slot] = 0
+
+    def _advance(self, slot: int, bucket: int):
+        head = self.head[slot]
+        if bucket <= head:
+            return
+
+        if bucket - head >= self.n_buckets:
+            self.counts[slot] = 0
+            self.sums[slot] = 0.0
+        else:
+            expired = np.arange(head + 1, bucket + 1) % self.n_buckets
+            self.counts[slot, expired] = 0
+            self.sums[slot, expired] = 0.0
+        self.head[slot] = bucket
+
+    def add(self, slot: int, timestamp: float, amount: float):
+        bucket = int(timestamp // self.bucket_seconds)
+        self._advance(slot, bucket)
+
+        # Late events still count while their bucket is inside the window
+        if self.head[slot] - bucket < self.n_buckets:
+            index = bucket % self.n_buckets
+            self.counts[slot, index] += 1
+            self.sums[slot, index] += amount
+
+    def totals(self, slot: int, timestamp: float):
+        # Read-only: a lookup ahead of the newest bucket must not expire data
+        # that later updates still belong to
+        target = int(timestamp // self.bucket_seconds)
+        head = int(self.head[slot])
+        index = np.arange(self.n_buckets)
+        buckets = head - (head - index) % self.n_buckets  # absolute bucket held at each index
+        mask = (buckets > target - self.n_buckets) & (buckets <= min(target, head))
+        return int(self.counts[slot, mask].sum()), float(self.sums[slot, mask].sum())
+
+
+class VelocityFeatureStore:
+    """
+    In-process sliding-window transaction velocity per sender address.
+
+    Feeds `transaction_count_1h/24h` and `avg_amount_1h/24h` from what the
+    monitor has actually seen instead of trusting caller-supplied fields.
+    Windows are bucketed (5-minute buckets for 1h, hourly for 24h), state for
+    all addresses lives in preallocated arrays of `max_addresses` slots, and
+    addresses are evicted least-recently-updated first once the store is full
+    or they have been idle longer than the widest window.
+    """
+
+    # window name -> (bucket width in seconds, number of buckets)
+    WINDOWS = {
+        '1h': (300, 12),
+        '24h': (3600, 24),
+    }
+
+    def __init__(self, max_addresses: int = 100000, idle_seconds: Optional[int] = None):
+        self.max_addresses = max_addresses
+        self.idle_seconds = idle_seconds or max(w * n for w, n in self.WINDOWS.values())
+
+        self.windows = {
+            name: _BucketedWindow(max_addresses, width, n_buckets)
+            for name, (width, n_buckets) in self.WINDOWS.items()
+        }
+        self.last_seen = np.zeros(max_addresses, dtype=np.float64)
+
+        self._slots: 'OrderedDict[str, int]' = OrderedDict()  # least recently updated first
+        self._free_slots = list(range(max_addresses - 1, -1, -1))
+        self._lock = threading.Lock()
+
+        self.updates = 0
+        self.evictions = 0
+
+    def update(self, address: str, amount: float, timestamp: Optional[float] = None):
+        """Record a transaction sent by `address`"""
+        if not address:
+            return
+        timestamp = timestamp or time.time()
+
+        with self._lock:
+            self._evict_idle(timestamp)
+
+            slot = self._slots.get(address)
+            if slot is None:
+                slot = self._allocate(address)
+            else:
+                self._slots.move_to_end(address)
+
+            for window in self.windows.values():
+                window.add(slot, timestamp, amount)
+            self.last_seen[slot] = max(self.last_seen[slot], timestamp)
+            self.updates += 1
+
+    def lookup(self, address: str, timestamp: Optional[float] = None) -> Dict:
+        """
+        Velocity features for `address` at `timestamp`, keyed like the
+        transaction fields `extract_features` reads.
+        """
+        timestamp = timestamp or time.time()
+        features = {}
+
+        with self._lock:
+            slot = self._slots.get(address) if address else None
+
+            for name, window in self.windows.items():
+                count, total = window.totals(slot, timestamp) if slot is not None else (0, 0.0)
+                features[f'tx_count_{name}'] = count
+                features[f'avg_amount_{name}'] = total / count if count else 0.0
+
+        return features
+
+    def _allocate(self, address: str) -> int:
+        if not self._free_slots:
+            self._evict(next(iter(self._slots)))
+
+        slot = self._free_slots.pop()
+        for window in self.windows.values():
+            window.reset(slot)
+        self.last_seen[slot] = 0.0
+        self._slots[address] = slot
+        return slot
+
+    def _evict(self, address: str):
+        self._free_slots.append(self._slots.pop(address))
+        self.evictions += 1
+
+    def _evict_idle(self, now: float):
+        cutoff = now - self.idle_seconds
+        while self._slots:
+            address, slot = next(iter(self._slots.items()))
+            if self.last_seen[slot] >= cutoff:
+                break
+            self._evict(address)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get_stats(self) -> Dict:
+        """Get store occupancy statistics"""
+        return {
+            'tracked_addresses': len(self._slots),
+            'max_addresses': self.max_addresses,
+            'updates': self.updates,
+            'evictions': self.evictions,
+            'memory_bytes': sum(w.counts.nbytes + w.sums.nbytes + w.head.nbytes for w in self.windows.values())
+                            + self.last_seen.nbytes
+        }
+
+
+def snapshot_history(transaction: Dict, feature_store=None, risk_engine=None) -> Dict:
+    """
+    Address history for `transaction` from the given stores, keyed like the
+    transaction fields `FraudDetector.extract_features` reads: sender
+    velocity from a VelocityFeatureStore and sender/receiver risk from an
+    AddressRiskEngine, both as of the transaction's timestamp. Empty when
+    no store is given.
+    """
+    history = {}
+    timestamp = transaction.get('timestamp')
+
+    if feature_store is not None:
+        history.update(feature_store.lookup(transaction.get('sender'), timestamp))
+
+    if risk_engine is not None:
+        history['sender_risk'] = risk_engine.risk_score(transaction.get('sender'), timestamp)
+        history['receiver_risk'] = risk_engine.risk_score(transaction.get('receiver'), timestamp)
+
+    return history
@@ -6,23 +6,51 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 import logging
-from typing import Dict, List, Tuple, Optional
-import tensorflow as tf
-from tensorflow import keras
+import os
+from typing import Dict, List, Tuple, Optional, TYPE_CHECKING
 from datetime import datetime, timedelta
 
+import model_store
+from feature_store import snapshot_history
+from nn_inference import NumpyNetwork
+from tree_ensemble import CompiledIsolationForest, CompiledRandomForest
+
+# TensorFlow is only needed to build, train or load the Keras network and
+# costs seconds to import, so it is imported inside those methods.
+if TYPE_CHECKING:
+    from tensorflow import keras
+
 class FraudDetector:
     """
     Advanced fraud detection system using ensemble methods and neural networks.
     """
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, nn_backend: str = 'numpy',
+                 tree_backend: str = 'compiled', mmap_model: bool = False,
+                 feature_store=None, risk_engine=None):
+        if nn_backend not in ('numpy', 'keras'):
+            raise ValueError(f"Unknown nn_backend: {nn_backend}")
+        if tree_backend not in ('compiled', 'sklearn'):
+            raise ValueError(f"Unknown tree_backend: {tree_backend}")
+        
         self.logger = logging.getLogger(__name__)
         self.scaler = StandardScaler()
         self.isolation_forest = IsolationForest(contamination=0.1, random_state=42)
         self.random_forest = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.compiled_isolation_forest = None
+        self.compiled_random_forest = None
+        self.tree_backend = tree_backend
+        # Above this batch size sklearn's compiled per-tree loop is faster
+        # (see benchmarks/bench_tree_ensemble.py); results are identical.
+        self.compiled_max_batch = 512
         self.neural_network = None
+        self.nn_inference = None  # NumpyNetwork exported from the Keras model
+        self.nn_backend = nn_backend
         self.is_trained = False
+        # VelocityFeatureStore supplying per-sender history, if attached
+        self.feature_store = feature_store
+        # AddressRiskEngine supplying sender/receiver risk, if attached
+        self.risk_engine = risk_engine
         self.feature_columns = [
             'amount', 'hour', 'day_of_week', 'transaction_count_1h',
             'transaction_count_24h', 'avg_amount_1h', 'avg_amount_24h',
@@ -30,7 +58,14 @@ class FraudDetector:
         ]
         
         if model_path:
-            self.load_model(model_path)
+            self.load_model(model_path, mmap=mmap_model)
+    
+    def lookup_history(self, transaction: Dict) -> Dict:
+        """
+        Address history from the attached stores, keyed like the transaction
+        fields `extract_features` reads. Empty when no store is attached.
+        """
+        return snapshot_history(transaction, self.feature_store, self.risk_engine)
     
     def extract_features(self, transaction: Dict) -> Dict:
         """
@@ -38,6 +73,15 @@ class FraudDetector:
         """
         features = {}
         
+        # Address history overrides caller fields. A `history` snapshot taken
+        # when the transaction was ingested wins over a lookup now, which
+        # would already include later transactions from the same sender.
+        history = transaction.get('history')
+        if history is None:
+            history = self.lookup_history(transaction)
+        if history:
+            transaction = {**transaction, **history}
+        
         # Basic transaction features
         features['amount'] = float(transaction.get('amount', 0))
         
@@ -47,13 +91,13 @@ class FraudDetector:
         features['hour'] = dt.hour
         features['day_of_week'] = dt.weekday()
         
-        # Historical transaction patterns (would come from database in production)
+        # Historical transaction patterns
         features['transaction_count_1h'] = transaction.get('tx_count_1h', 0)
         features['transaction_count_24h'] = transaction.get('tx_count_24h', 0)
         features['avg_amount_1h'] = transaction.get('avg_amount_1h', 0)
         features['avg_amount_24h'] = transaction.get('avg_amount_24h', 0)
         
-        # Risk scores (would be calculated from address history)
+        # Risk scores
         features['sender_risk_score'] = transaction.get('sender_risk', 0.0)
         features['receiver_risk_score'] = transaction.get('receiver_risk', 0.0)
         
@@ -80,10 +124,29 @@ class FraudDetector:
         
         return X_scaled
     
-    def build_neural_network(self, input_dim: int) -> keras.Model:
+    def preprocess_features(self, features: List[Dict]) -> np.ndarray:
+        """
+        Preprocess extracted feature dicts for inference without pandas.
+        
+        Writes the features straight into a float64 matrix ordered by
+        `feature_columns` (missing features are 0, as in `preprocess_data`)
+        and applies the fitted scaler's mean/scale in place. Produces the same
+        values as the DataFrame path, which stays in use for training.
+        """
+        X = np.empty((len(features), len(self.feature_columns)), dtype=np.float64)
+        for i, row in enumerate(features):
+            X[i] = [row.get(col, 0) for col in self.feature_columns]
+        
+        np.divide(np.subtract(X, self.scaler.mean_, out=X), self.scaler.scale_, out=X)
+        
+        return X
+    
+    def build_neural_network(self, input_dim: int) -> 'keras.Model':
         """
         Build a neural network for fraud detection.
         """
+        from tensorflow import keras
+        
         model = keras.Sequential([
             keras.layers.Dense(128, activation='relu', input_shape=(input_dim,)),
             keras.layers.Dropout(0.3),
@@ -106,8 +169,13 @@ class FraudDetector:
         """
         Train the fraud detection models.
         """
+        if self.random_forest is None:
+            raise ValueError("Cannot train a memory-mapped serving model; use a new FraudDetector")
+        
         self.logger.info("Starting model training...")
         
+        from tensorflow import keras
+        
         # Preprocess data
         X = self.preprocess_data(training_data)
         
@@ -122,6 +190,8 @@ class FraudDetector:
         # Train Random Forest
         self.random_forest.fit(X_train, y_train)
         
+        self._compile_trees()
+        
         # Train Neural Network
         self.neural_network = self.build_neural_network(X.shape[1])
         
@@ -139,6 +209,9 @@ class FraudDetector:
             verbose=1
         )
         
+        # Export the trained network for TensorFlow-free inference
+        self.nn_inference = NumpyNetwork.from_keras(self.neural_network)
+        
         # Evaluate models
         rf_pred = self.random_forest.predict(X_test)
         nn_pred = (self.neural_network.predict(X_test) > 0.5).astype(int)
@@ -159,58 +232,131 @@ class FraudDetector:
         """
         Predict if a transaction is fraudulent.
         """
+        return self.predict_batch([transaction])[0]
+    
+    def predict_batch(self, transactions: List[Dict]) -> List[Dict]:
+        """
+        Predict fraud for many transactions in a single vectorized pass.
+        
+        Builds one feature matrix for the whole batch and calls each model
+        once, so the per-call model overhead is paid per batch instead of
+        per transaction. Results match calling `predict` on each row.
+        """
         if not self.is_trained:
             raise ValueError("Model must be trained before making predictions")
         
+        if not transactions:
+            return []
+        
         # Extract features
-        features = self.extract_features(transaction)
+        features = [self.extract_features(tx) for tx in transactions]
         
-        # Convert to DataFrame and preprocess
-        df = pd.DataFrame([features])
-        X = self.preprocess_data(df)
+        X = self.preprocess_features(features)
         
-        # Get predictions from all models
-        isolation_pred = self.isolation_forest.predict(X)[0]  # -1 for anomaly, 1 for normal
-        isolation_score = self.isolation_forest.score_samples(X)[0]
+        scores = self._score_ensemble(X)
+        timestamp = datetime.now().isoformat()
         
-        rf_pred = self.random_forest.predict(X)[0]
-        rf_proba = self.random_forest.predict_proba(X)[0][1]  # Probability of fraud
+        return [
+            self._build_result(scores, i, features[i], timestamp)
+            for i in range(len(transactions))
+        ]
+    
+    def _score_ensemble(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Run every model once over a preprocessed feature matrix and combine
+        the votes into per-row ensemble arrays.
+        """
+        # One scoring pass per model; labels are derived from the scores the
+        # same way sklearn's predict() does, so the trees are walked once.
+        isolation_forest, random_forest = self._tree_models(X.shape[0])
+        
+        isolation_score = isolation_forest.score_samples(X)
+        isolation_pred = np.where(
+            isolation_score - isolation_forest.offset_ < 0, -1, 1
+        )  # -1 for anomaly, 1 for normal
         
-        nn_pred = self.neural_network.predict(X)[0][0]
+        rf_proba_all = random_forest.predict_proba(X)
+        rf_pred = random_forest.classes_.take(np.argmax(rf_proba_all, axis=1))
+        rf_proba = rf_proba_all[:, 1]  # Probability of fraud
+        
+        nn_pred = self._nn_model().predict(X, verbose=0)[:, 0].astype(np.float64)
         
         # Ensemble prediction
-        fraud_indicators = [
-            isolation_pred == -1,  # Isolation forest detects anomaly
-            rf_pred == 1,          # Random forest predicts fraud
-            nn_pred > 0.5          # Neural network predicts fraud
-        ]
+        fraud_count = (
+            (isolation_pred == -1).astype(int) +  # Isolation forest detects anomaly
+            (rf_pred == 1).astype(int) +          # Random forest predicts fraud
+            (nn_pred > 0.5).astype(int)           # Neural network predicts fraud
+        )
         
-        fraud_count = sum(fraud_indicators)
-        ensemble_confidence = (fraud_count / 3) * max(rf_proba, nn_pred)
+        risk_score = np.maximum(rf_proba, nn_pred)
+        ensemble_confidence = (fraud_count / 3) * risk_score
         
         # Determine final prediction
-        is_fraud = fraud_count >= 2 or ensemble_confidence > 0.7
+        is_fraud = (fraud_count >= 2) | (ensemble_confidence > 0.7)
         
         return {
-            'is_fraud': bool(is_fraud),
-            'confidence': float(ensemble_confidence),
-            'risk_score': float(max(rf_proba, nn_pred)),
+            'is_fraud': is_fraud,
+            'confidence': ensemble_confidence,
+            'risk_score': risk_score,
+            'isolation_pred': isolation_pred,
+            'isolation_score': isolation_score,
+            'rf_pred': rf_pred,
+            'rf_proba': rf_proba,
+            'nn_pred': nn_pred
+        }
+    
+    def _compile_trees(self):
+        """
+        Pack the fitted forests into flat arrays for vectorized scoring.
+        """
+        self.compiled_isolation_forest = CompiledIsolationForest.from_sklearn(self.isolation_forest)
+        self.compiled_random_forest = CompiledRandomForest.from_sklearn(self.random_forest)
+    
+    def _tree_models(self, batch_size: int):
+        """
+        Return the (isolation forest, random forest) pair used for inference
+        according to `tree_backend` and the batch size.
+        """
+        if self.random_forest is None:
+            # Loaded from the serving format; only compiled trees exist
+            return self.compiled_isolation_forest, self.compiled_random_forest
+        if (self.tree_backend == 'compiled' and self.compiled_random_forest is not None
+                and batch_size <= self.compiled_max_batch):
+            return self.compiled_isolation_forest, self.compiled_random_forest
+        return self.isolation_forest, self.random_forest
+    
+    def _nn_model(self):
+        """
+        Return the network used for inference according to `nn_backend`.
+        """
+        if self.nn_backend == 'numpy' and self.nn_inference is not None:
+            return self.nn_inference
+        return self.neural_network
+    
+    def _build_result(self, scores: Dict[str, np.ndarray], i: int, features: Dict, timestamp: str) -> Dict:
+        """
+        Assemble the prediction dict for row `i` of an ensemble score batch.
+        """
+        return {
+            'is_fraud': bool(scores['is_fraud'][i]),
+            'confidence': float(scores['confidence'][i]),
+            'risk_score': float(scores['risk_score'][i]),
             'models': {
                 'isolation_forest': {
-                    'prediction': 'anomaly' if isolation_pred == -1 else 'normal',
-                    'score': float(isolation_score)
+                    'prediction': 'anomaly' if scores['isolation_pred'][i] == -1 else 'normal',
+                    'score': float(scores['isolation_score'][i])
                 },
                 'random_forest': {
-                    'prediction': bool(rf_pred),
-                    'probability': float(rf_proba)
+                    'prediction': bool(scores['rf_pred'][i]),
+                    'probability': float(scores['rf_proba'][i])
                 },
                 'neural_network': {
-                    'prediction': bool(nn_pred > 0.5),
-                    'probability': float(nn_pred)
+                    'prediction': bool(scores['nn_pred'][i] > 0.5),
+                    'probability': float(scores['nn_pred'][i])
                 }
             },
             'features_used': features,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
         }
     
     def save_model(self, filepath: str):
@@ -219,6 +365,8 @@ class FraudDetector:
         """
         if not self.is_trained:
             raise ValueError("No trained model to save")
+        if self.random_forest is None:
+            raise ValueError("Cannot save a memory-mapped serving model; it has no sklearn models")
         
         model_data = {
             'scaler': self.scaler,
@@ -232,15 +380,78 @@ class FraudDetector:
         joblib.dump(model_data, f"{filepath}_ml.pkl")
         
         # Save neural network separately
-        self.neural_network.save(f"{filepath}_nn.h5")
+        if self.neural_network is not None:
+            self.neural_network.save(f"{filepath}_nn.h5")
+        
+        # Save the exported NumPy weights for TensorFlow-free serving
+        self.nn_inference.save(f"{filepath}_nn.npz")
+        
+        self.export_serving_model(filepath)
         
         self.logger.info(f"Model saved to {filepath}")
     
-    def load_model(self, filepath: str):
+    def export_serving_model(self, filepath: str):
+        """
+        Save the inference state as flat `.npy` arrays for memory-mapped serving.
+        
+        Writes the scaler parameters, compiled tree arrays and network weights
+        to `{filepath}_serving/`, which `load_model(..., mmap=True)` maps
+        read-only so all worker processes share the same physical pages.
+        """
+        if not self.is_trained:
+            raise ValueError("No trained model to export")
+        
+        arrays = {
+            'scaler.mean': self.scaler.mean_,
+            'scaler.scale': self.scaler.scale_
+        }
+        arrays.update(model_store.prefixed('isolation_forest', self.compiled_isolation_forest.to_arrays()))
+        arrays.update(model_store.prefixed('random_forest', self.compiled_random_forest.to_arrays()))
+        arrays.update(model_store.prefixed('neural_network', self.nn_inference.to_arrays()))
+        
+        model_store.save_arrays(
+            f"{filepath}_serving", arrays, {'feature_columns': self.feature_columns}
+        )
+    
+    def _load_serving_model(self, filepath: str):
+        """
+        Memory-map a model written by `export_serving_model`.
+        """
+        arrays, metadata = model_store.load_arrays(f"{filepath}_serving", mmap=True)
+        
+        self.scaler = StandardScaler()
+        self.scaler.mean_ = arrays['scaler.mean']
+        self.scaler.scale_ = arrays['scaler.scale']
+        self.scaler.n_features_in_ = len(metadata['feature_columns'])
+        
+        # Only the compiled models are available in this format
+        self.isolation_forest = None
+        self.random_forest = None
+        self.compiled_isolation_forest = CompiledIsolationForest.from_arrays(
+            model_store.unprefixed('isolation_forest', arrays)
+        )
+        self.compiled_random_forest = CompiledRandomForest.from_arrays(
+            model_store.unprefixed('random_forest', arrays)
+        )
+        self.nn_inference = NumpyNetwork.from_arrays(model_store.unprefixed('neural_network', arrays))
+        
+        self.feature_columns = metadata['feature_columns']
+        self.is_trained = True
+    
+    def load_model(self, filepath: str, mmap: bool = False):
         """
         Load a trained model from disk.
+        
+        With `mmap` the serving arrays written by `export_serving_model` are
+        memory-mapped instead of unpickling the sklearn models; such a
+        detector can predict but not be retrained or saved.
         """
         try:
+            if mmap:
+                self._load_serving_model(filepath)
+                self.logger.info(f"Model memory-mapped from {filepath}_serving")
+                return
+            
             # Load traditional ML models
             model_data = joblib.load(f"{filepath}_ml.pkl")
             
@@ -249,9 +460,17 @@ class FraudDetector:
             self.random_forest = model_data['random_forest']
             self.feature_columns = model_data['feature_columns']
             self.is_trained = model_data['is_trained']
+            self._compile_trees()
             
-            # Load neural network
-            self.neural_network = keras.models.load_model(f"{filepath}_nn.h5")
+            # Load neural network; the NumPy export is enough to serve
+            # without touching Keras
+            nn_export = f"{filepath}_nn.npz"
+            if self.nn_backend == 'numpy' and os.path.exists(nn_export):
+                self.nn_inference = NumpyNetwork.load(nn_export)
+            else:
+                from tensorflow import keras
+                self.neural_network = keras.models.load_model(f"{filepath}_nn.h5")
+                self.nn_inference = NumpyNetwork.from_keras(self.neural_network)
             
             self.logger.info(f"Model loaded from {filepath}")
             
@@ -266,7 +485,8 @@ class FraudDetector:
         if not self.is_trained:
             raise ValueError("Model must be trained first")
         
-        importance = self.random_forest.feature_importances_
+        forest = self.random_forest if self.random_forest is not None else self.compiled_random_forest
+        importance = forest.feature_importances_
         feature_importance = dict(zip(self.feature_columns, importance))
         
         # Sort by importance
@@ -0,0 +1,62 @@
+import json
+import os
+import shutil
+import numpy as np
+from typing import Dict, Tuple
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def save_arrays(directory: str, arrays: Dict[str, np.ndarray], metadata: Dict):
+    """
+    Write each array as its own `.npy` file plus a JSON manifest.
+
+    The directory is built next to the target and swapped in at the end, so
+    readers never see a half-written model.
+    """
+    tmp_dir = f"{directory}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+        json.dump({'arrays': sorted(arrays), 'metadata': metadata}, f)
+
+    old_dir = f"{directory}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, old_dir)
+    os.rename(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_arrays(directory: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Load arrays written by `save_arrays`.
+
+    With `mmap` the arrays are read-only memory maps, so every process that
+    loads the same directory shares one copy of the pages in the OS cache.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+        for name in manifest['arrays']
+    }
+
+    return arrays, manifest['metadata']
+
+
+def prefixed(prefix: str, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Namespace a component's arrays as `prefix.name`"""
+    return {f"{prefix}.{name}": array for name, array in arrays.items()}
+
+
+def unprefixed(prefix: str, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Select a component's arrays saved with `prefixed`"""
+    start = f"{prefix}."
+    return {name[len(start):]: array for name, array in arrays.items() if name.startswith(start)}
@@ -0,0 +1,99 @@
+import numpy as np
+from typing import Dict, List
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+}
+
+
+class NumpyNetwork:
+    """
+    Inference-only forward pass of a trained Keras Dense network.
+
+    Holds the kernel/bias of every Dense layer and evaluates them as float32
+    NumPy matmuls, which is what Keras computes at inference time (Dropout is
+    the identity once training is off). Serving through this class needs no
+    TensorFlow import and avoids the per-call setup cost of `Model.predict`.
+    """
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray], activations: List[str]):
+        if not (len(weights) == len(biases) == len(activations)):
+            raise ValueError("weights, biases and activations must have the same length")
+
+        for activation in activations:
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+
+    @classmethod
+    def from_keras(cls, model) -> 'NumpyNetwork':
+        """
+        Export the Dense layers of a trained Keras Sequential model.
+        """
+        weights, biases, activations = [], [], []
+
+        for layer in model.layers:
+            layer_type = type(layer).__name__
+            if layer_type == 'Dropout':
+                continue
+            if layer_type != 'Dense':
+                raise ValueError(f"Unsupported layer for NumPy inference: {layer_type}")
+
+            kernel, bias = layer.get_weights()
+            weights.append(kernel)
+            biases.append(bias)
+            activations.append(layer.get_config()['activation'])
+
+        return cls(weights, biases, activations)
+
+    def predict(self, X: np.ndarray, verbose: int = 0) -> np.ndarray:
+        """
+        Run the forward pass; returns an (n, units) float32 array like Keras.
+        """
+        h = np.asarray(X, dtype=np.float32)
+
+        for w, b, activation in zip(self.weights, self.biases, self.activations):
+            h = _ACTIVATIONS[activation](h @ w + b)
+
+        return h
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'kernel_{i}'] = w
+            arrays[f'bias_{i}'] = b
+        arrays['activations'] = np.array(self.activations)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'NumpyNetwork':
+        activations = [str(a) for a in arrays['activations']]
+        weights = [arrays[f'kernel_{i}'] for i in range(len(activations))]
+        biases = [arrays[f'bias_{i}'] for i in range(len(activations))]
+        return cls(weights, biases, activations)
+
+    def save(self, filepath: str):
+        """
+        Save the exported weights to a `.npz` archive.
+        """
+        np.savez(filepath, **self.to_arrays())
+
+    @classmethod
+    def load(cls, filepath: str) -> 'NumpyNetwork':
+        """
+        Load weights written by `save`.
+        """
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls.from_arrays({name: data[name] for name in data.files})
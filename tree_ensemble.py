@@ -0,0 +1,284 @@
+import numpy as np
+import sklearn
+from sklearn.ensemble._iforest import _average_path_length
+from sklearn.utils.fixes import parse_version
+from typing import Dict, List, Optional
+
+# Since scikit-learn 1.4 classifier trees store class fractions in
+# `tree_.value` and `predict_proba` returns them as-is; before that they
+# stored weighted counts that `predict_proba` normalised per sample.
+_TREE_VALUES_ARE_FRACTIONS = parse_version(sklearn.__version__) >= parse_version('1.4')
+
+# Rows traversed per chunk; keeps the (rows, trees) index arrays in cache.
+_CHUNK_SIZE = 256
+
+# Traversal steps between dropping (row, tree) pairs that reached a leaf.
+_STEPS_PER_COMPACTION = 4
+
+
+class FlatTreeEnsemble:
+    """
+    All trees of a fitted sklearn ensemble packed into contiguous arrays.
+
+    Nodes of every tree are concatenated so one gather step advances every
+    (sample, tree) pair of a batch at once. Leaves point to themselves and
+    compare against +inf, so extra steps past a leaf are harmless; pairs
+    that reached a leaf are dropped every few steps to bound wasted work.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 is_leaf: np.ndarray, roots: np.ndarray):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children  # children[2 * node + go_right] is the next node
+        self.is_leaf = is_leaf
+        self.roots = roots
+        self.n_trees = len(roots)
+
+    @classmethod
+    def from_trees(cls, trees: List, feature_maps: Optional[List[np.ndarray]] = None) -> 'FlatTreeEnsemble':
+        """
+        Pack fitted sklearn decision trees.
+        """
+        features, thresholds, lefts, rights = [], [], [], []
+        roots = []
+        offset = 0
+
+        for i, tree in enumerate(trees):
+            t = tree.tree_
+            node_ids = np.arange(t.node_count)
+            is_leaf = t.children_left == -1
+
+            feature = np.where(is_leaf, 0, t.feature)
+            if feature_maps is not None:
+                feature = np.asarray(feature_maps[i])[feature]
+
+            features.append(feature)
+            thresholds.append(np.where(is_leaf, np.inf, t.threshold))
+            lefts.append(np.where(is_leaf, node_ids, t.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, t.children_right) + offset)
+
+            roots.append(offset)
+            offset += t.node_count
+
+        left = np.concatenate(lefts).astype(np.intp)
+        right = np.concatenate(rights).astype(np.intp)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.stack([left, right], axis=1).ravel(),
+            is_leaf=left == np.arange(offset),
+            roots=np.array(roots, dtype=np.intp)
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children': self.children,
+            'is_leaf': self.is_leaf,
+            'roots': self.roots
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'FlatTreeEnsemble':
+        return cls(**{name: arrays[name] for name in ('feature', 'threshold', 'children', 'is_leaf', 'roots')})
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Return the global leaf index reached in every tree, shape (n, trees).
+        """
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.intp)
+
+        for start in range(0, X.shape[0], _CHUNK_SIZE):
+            chunk = X[start:start + _CHUNK_SIZE]
+            flat = chunk.ravel()
+            n_rows = chunk.shape[0]
+
+            # One entry per (row, tree) pair
+            node = np.tile(self.roots, n_rows)
+            row_offset = np.repeat(np.arange(n_rows, dtype=np.intp) * chunk.shape[1], self.n_trees)
+            pairs = np.arange(node.size)
+            current = node
+
+            while current.size:
+                for _ in range(_STEPS_PER_COMPACTION):
+                    go_right = (
+                        np.take(flat, row_offset + np.take(self.feature, current))
+                        > np.take(self.threshold, current)
+                    )
+                    current = np.take(self.children, 2 * current + go_right)
+
+                node[pairs] = current
+                pending = ~np.take(self.is_leaf, current)
+                pairs = pairs[pending]
+                current = current[pending]
+                row_offset = row_offset[pending]
+
+            leaves[start:start + _CHUNK_SIZE] = node.reshape(n_rows, self.n_trees)
+
+        return leaves
+
+
+class CompiledRandomForest:
+    """
+    Drop-in `predict_proba` for a fitted RandomForestClassifier.
+
+    Per-node class probabilities are precomputed exactly as each tree's
+    `predict_proba` would return them and summed in estimator order, so the
+    result is bit-identical to the sklearn forest.
+    """
+
+    def __init__(self, ensemble: FlatTreeEnsemble, node_proba: np.ndarray, classes_: np.ndarray,
+                 feature_importances_: np.ndarray):
+        self.ensemble = ensemble
+        self.node_proba = node_proba
+        self.classes_ = classes_
+        self.feature_importances_ = feature_importances_
+        self.n_estimators = ensemble.n_trees
+
+    @classmethod
+    def from_sklearn(cls, forest) -> 'CompiledRandomForest':
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        n_classes = len(forest.classes_)
+        node_proba = []
+        for tree in forest.estimators_:
+            proba = tree.tree_.value[:, 0, :n_classes].astype(np.float64)
+            if not _TREE_VALUES_ARE_FRACTIONS:
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer
+            node_proba.append(proba)
+
+        return cls(
+            FlatTreeEnsemble.from_trees(forest.estimators_),
+            np.concatenate(node_proba),
+            forest.classes_,
+            forest.feature_importances_
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            **self.ensemble.to_arrays(),
+            'node_proba': self.node_proba,
+            'classes': self.classes_,
+            'feature_importances': self.feature_importances_
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'CompiledRandomForest':
+        return cls(
+            FlatTreeEnsemble.from_arrays(arrays),
+            arrays['node_proba'],
+            arrays['classes'],
+            arrays['feature_importances']
+        )
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaf_proba = self.node_proba[self.ensemble.apply(X)]  # (n, trees, classes)
+
+        # Accumulate in estimator order like sklearn to keep identical rounding
+        proba = np.zeros((leaf_proba.shape[0], leaf_proba.shape[2]))
+        for t in range(self.n_estimators):
+            proba += leaf_proba[:, t]
+        proba /= self.n_estimators
+
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+class CompiledIsolationForest:
+    """
+    Drop-in `score_samples` for a fitted IsolationForest.
+
+    Each leaf stores its path-length contribution (depth plus the average
+    path length of the samples left in it, minus one), which is what sklearn
+    adds per tree; contributions are summed in estimator order.
+    """
+
+    def __init__(self, ensemble: FlatTreeEnsemble, leaf_depth: np.ndarray, denominator: np.ndarray,
+                 offset_: float):
+        self.ensemble = ensemble
+        self.leaf_depth = leaf_depth
+        self.denominator = denominator
+        self.offset_ = offset_
+        self.n_estimators = ensemble.n_trees
+
+    @classmethod
+    def from_sklearn(cls, forest) -> 'CompiledIsolationForest':
+        feature_maps = None
+        if forest._max_features != forest.n_features_in_:
+            feature_maps = forest.estimators_features_
+
+        leaf_depth = []
+        for tree in forest.estimators_:
+            t = tree.tree_
+            leaf_depth.append(
+                _node_depths(t) + _average_path_length(t.n_node_samples) - 1.0
+            )
+
+        return cls(
+            FlatTreeEnsemble.from_trees(forest.estimators_, feature_maps),
+            np.concatenate(leaf_depth),
+            len(forest.estimators_) * _average_path_length([forest._max_samples]),
+            forest.offset_
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            **self.ensemble.to_arrays(),
+            'leaf_depth': self.leaf_depth,
+            'denominator': self.denominator,
+            'offset': np.array([self.offset_])
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'CompiledIsolationForest':
+        return cls(
+            FlatTreeEnsemble.from_arrays(arrays),
+            arrays['leaf_depth'],
+            arrays['denominator'],
+            float(arrays['offset'][0])
+        )
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        leaf_depth = self.leaf_depth[self.ensemble.apply(X)]  # (n, trees)
+
+        depths = np.zeros(leaf_depth.shape[0])
+        for t in range(self.n_estimators):
+            depths += leaf_depth[:, t]
+
+        scores = 2 ** (
+            -np.divide(
+                depths, self.denominator, out=np.ones_like(depths), where=self.denominator != 0
+            )
+        )
+        return -scores
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+
+def _node_depths(tree) -> np.ndarray:
+    """
+    Number of nodes on the path from the root to each node (root counts 1).
+    """
+    depths = np.zeros(tree.node_count, dtype=np.intp)
+    depths[0] = 1
+    # Children always have larger ids than their parent in sklearn trees
+    for node in range(tree.node_count):
+        left = tree.children_left[node]
+        if left != -1:
+            depths[left] = depths[node] + 1
+            depths[tree.children_right[node]] = depths[node] + 1
+    return depths